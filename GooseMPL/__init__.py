@@ -4,7 +4,7 @@ This module provides some extensions to matplotlib.
 :dependencies:
 
     * numpy
-    * matplotlib
+    * matplotlib (imported on first use by plot functions)
 
 :copyright:
 
@@ -14,18 +14,37 @@ This module provides some extensions to matplotlib.
 """
 from __future__ import annotations
 
+import functools
 import textwrap
+from typing import TYPE_CHECKING
 
-import deprecation
-import matplotlib.colors
-import matplotlib.pyplot as plt
 import numpy as np
-import yaml
 from numpy.typing import ArrayLike
-from scipy.optimize import curve_fit
 
 from ._version import version
 
+if TYPE_CHECKING:
+    import matplotlib.colors
+    import matplotlib.pyplot as plt
+
+
+def _deprecated(**kwargs):
+    """
+    Lazy version of ``deprecation.deprecated``:
+    the ``deprecation`` module is only imported once the decorated function is called.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kw):
+            import deprecation
+
+            return deprecation.deprecated(current_version=version, **kwargs)(func)(*args, **kw)
+
+        return wrapper
+
+    return decorator
+
 
 def system_has_latex():
     r"""
@@ -78,6 +97,9 @@ def copy_style():
 
     import os
 
+    import matplotlib
+    import yaml
+
     # style definitions
     # -----------------
 
@@ -218,6 +240,9 @@ def asLinearSegmentedColormap(
     :param cmap: Matrix of colors [n, 3].
     :return: The LinearSegmentedColormap.
     """
+
+    import matplotlib.colors
+
     assert cmap.ndim == 2
     assert cmap.shape[1] == 3
     return matplotlib.colors.LinearSegmentedColormap.from_list(
@@ -245,6 +270,8 @@ def ticks(
     :return: ticks, labels
     """
 
+    import matplotlib.pyplot as plt
+
     direction = direction.lower()
     output_only = axis is None
     axis = axis if axis else plt.gca()
@@ -381,6 +408,8 @@ def log_ticks(
     :return: ticks, labels
     """
 
+    import matplotlib.pyplot as plt
+
     direction = direction.lower()
     output_only = axis is None
     axis = axis if axis else plt.gca()
@@ -479,6 +508,8 @@ def log_minorticks(
     :return: ticks, labels
     """
 
+    import matplotlib.pyplot as plt
+
     direction = direction.lower()
     output_only = axis is None
     axis = axis if axis else plt.gca()
@@ -576,6 +607,8 @@ def set_decade_lims(axis=None, direction=None):
             Limit the application to a certain direction (default: both).
     """
 
+    import matplotlib.pyplot as plt
+
     # get current axis
     if axis is None:
         axis = plt.gca()
@@ -649,6 +682,8 @@ def abs2rel_x(x, axis=None):
             Relative coordinates.
     """
 
+    import matplotlib.pyplot as plt
+
     # get current axis
     if axis is None:
         axis = plt.gca()
@@ -697,6 +732,8 @@ def abs2rel_y(y, axis=None):
             Relative coordinates.
     """
 
+    import matplotlib.pyplot as plt
+
     # get current axis
     if axis is None:
         axis = plt.gca()
@@ -745,6 +782,8 @@ def rel2abs_x(x, axis=None):
             Absolute coordinates.
     """
 
+    import matplotlib.pyplot as plt
+
     # get current axis
     if axis is None:
         axis = plt.gca()
@@ -793,6 +832,8 @@ def rel2abs_y(y, axis=None):
             Absolute coordinates.
     """
 
+    import matplotlib.pyplot as plt
+
     # get current axis
     if axis is None:
         axis = plt.gca()
@@ -830,6 +871,9 @@ def subplots(scale_x=None, scale_y=None, scale=None, **kwargs):
             Scale the figure-size (along one of the dimensions).
     """
 
+    import matplotlib
+    import matplotlib.pyplot as plt
+
     if "figsize" in kwargs:
         return plt.subplots(**kwargs)
 
@@ -861,6 +905,8 @@ def savefig(*args, **kwargs):
 
     import os
 
+    import matplotlib.pyplot as plt
+
     dirname = os.path.dirname(args[0])
 
     if len(dirname) > 0:
@@ -875,6 +921,8 @@ def close(*args, **kwargs):
     Run ``matplotlib.pyplot.close``.
     """
 
+    import matplotlib.pyplot as plt
+
     return plt.close(*args, **kwargs)
 
 
@@ -903,6 +951,8 @@ def plot(x, y, units="absolute", axis=None, **kwargs):
         The handle of the ``plt.plot(...)`` command.
     """
 
+    import matplotlib.pyplot as plt
+
     # get current axis
     if axis is None:
         axis = plt.gca()
@@ -944,6 +994,8 @@ def text(x, y, text, units="absolute", axis=None, **kwargs):
         The handle of the ``plt.text(...)`` command.
     """
 
+    import matplotlib.pyplot as plt
+
     # get current axis
     if axis is None:
         axis = plt.gca()
@@ -991,6 +1043,8 @@ def diagonal_powerlaw(
         The handle of the ``plt.plot(...)`` command (if any).
     """
 
+    import matplotlib.pyplot as plt
+
     axis = kwargs.pop("axis", plt.gca())
 
     if width and not height:
@@ -1078,6 +1132,8 @@ def annotate_powerlaw(text, exp, startx, starty, width=None, rx=0.5, ry=0.5, **k
         The handle of the ``plt.text(...)`` command.
     """
 
+    import matplotlib.pyplot as plt
+
     endx = kwargs.pop("endx", None)
     endy = kwargs.pop("endy", None)
     height = kwargs.pop("height", None)
@@ -1168,6 +1224,8 @@ def plot_powerlaw(exp, startx, starty, width=None, **kwargs):
         The handle of the ``plt.plot(...)`` command.
     """
 
+    import matplotlib.pyplot as plt
+
     return_parameters = kwargs.pop("return_parameters", False)
     endx = kwargs.pop("endx", None)
     endy = kwargs.pop("endy", None)
@@ -1250,6 +1308,8 @@ def grid_powerlaw(exp, insert=0, skip=0, end=-1, step=0, axis=None, **kwargs):
         The handle of the ``plt.plot(...)`` command.
     """
 
+    import matplotlib.pyplot as plt
+
     if axis is None:
         axis = plt.gca()
 
@@ -1355,46 +1415,315 @@ def grid_powerlaw(exp, insert=0, skip=0, end=-1, step=0, axis=None, **kwargs):
     return lines
 
 
+def _fit_linear_lsq(
+    x: ArrayLike,
+    y: ArrayLike,
+    w: ArrayLike = None,
+    absolute_sigma: bool = False,
+    offset: float = None,
+    slope: float = None,
+):
+    r"""
+    Weighted linear least-squares fit of :math:`y = a + b x`, solved in closed form.
+    The conventions of ``scipy.optimize.curve_fit`` are followed:
+    the weights are :math:`w = 1 / \sigma^2`, and unless ``absolute_sigma`` the covariance is
+    scaled by :math:`\chi^2 / (n - p)`, with :math:`n` the number of data-points and
+    :math:`p` the number of fitted parameters (infinite if :math:`n \leq p`).
+
+    All operations are along the last axis, such that several fits can be done at once.
+    Data-points with zero weight are ignored (their ``x`` and ``y`` must be finite).
+
+    :param x: Data points along the x-axis.
+    :param y: Data points along the y-axis.
+    :param w: Weight of each data-point (default: one, with ``absolute_sigma = False``).
+    :param absolute_sigma: Do not scale the covariance by the residuals.
+    :param offset: Offset :math:`a` (fitted if not specified).
+    :param slope: Slope :math:`b` (fitted if not specified).
+    :return: ``(offset, slope, pcov)``, with ``pcov[..., 2, 2]`` zero for fixed parameters.
+    """
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    if w is None:
+        w = np.ones_like(x)
+        absolute_sigma = False
+
+    w = np.asarray(w, dtype=float)
+    shape = x.shape[:-1]
+    pcov = np.zeros(shape + (2, 2))
+    free = np.array([offset is None, slope is None])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if offset is None and slope is None:
+            S = np.sum(w, axis=-1)
+            xm = np.sum(w * x, axis=-1) / S
+            ym = np.sum(w * y, axis=-1) / S
+            dx = x - xm[..., np.newaxis]
+            Sxx = np.sum(w * dx**2, axis=-1)
+            slope = np.sum(w * dx * (y - ym[..., np.newaxis]), axis=-1) / Sxx
+            offset = ym - slope * xm
+            pcov[..., 0, 0] = 1 / S + xm**2 / Sxx
+            pcov[..., 0, 1] = -xm / Sxx
+            pcov[..., 1, 0] = -xm / Sxx
+            pcov[..., 1, 1] = 1 / Sxx
+        elif offset is None:
+            slope = np.full(shape, slope, dtype=float)
+            S = np.sum(w, axis=-1)
+            offset = np.sum(w * (y - slope[..., np.newaxis] * x), axis=-1) / S
+            pcov[..., 0, 0] = 1 / S
+        elif slope is None:
+            offset = np.full(shape, offset, dtype=float)
+            Sxx = np.sum(w * x**2, axis=-1)
+            slope = np.sum(w * x * (y - offset[..., np.newaxis]), axis=-1) / Sxx
+            pcov[..., 1, 1] = 1 / Sxx
+        else:
+            offset = np.full(shape, offset, dtype=float)
+            slope = np.full(shape, slope, dtype=float)
+
+        if not absolute_sigma:
+            p = np.sum(free)
+            n = np.sum(w > 0, axis=-1)
+            r = y - offset[..., np.newaxis] - slope[..., np.newaxis] * x
+            chi2 = np.sum(w * r**2, axis=-1)
+            scale = np.where(n > p, chi2 / (n - p), np.inf)
+            pcov *= scale[..., np.newaxis, np.newaxis]
+            pcov[..., ~free, :] = 0
+            pcov[..., :, ~free] = 0
+
+    return offset[()], slope[()], pcov
+
+
+def _fit_linear_sums(
+    n: ArrayLike,
+    S: ArrayLike,
+    Sx: ArrayLike,
+    Sy: ArrayLike,
+    Sxx: ArrayLike,
+    Sxy: ArrayLike,
+    Syy: ArrayLike,
+    absolute_sigma: bool = False,
+):
+    r"""
+    Weighted linear least-squares fit of :math:`y = a + b x` from its sufficient statistics:
+    :math:`S = \sum w`, :math:`S_x = \sum w x`, :math:`S_{xy} = \sum w x y`, etc.,
+    with the same conventions as :py:func:`_fit_linear_lsq`.
+    The sums can be of any shape, e.g. differences of cumulative sums to fit many windows at once.
+    For accuracy, the data should be shifted such that :math:`x` and :math:`y` are close to zero.
+
+    :param n: Number of data-points (with non-zero weight).
+    :param absolute_sigma: Do not scale the covariance by the residuals.
+    :return: ``(offset, slope, pcov, chi2)``, with ``chi2`` the weighted sum of squared residuals.
+    """
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xm = Sx / S
+        ym = Sy / S
+        cxx = Sxx - Sx * xm
+        cxy = Sxy - Sx * ym
+        cyy = Syy - Sy * ym
+
+    return _fit_linear_moments(n, S, xm, ym, cxx, cxy, cyy, absolute_sigma)
+
+
+def _fit_linear_moments(
+    n: ArrayLike,
+    S: ArrayLike,
+    xm: ArrayLike,
+    ym: ArrayLike,
+    cxx: ArrayLike,
+    cxy: ArrayLike,
+    cyy: ArrayLike,
+    absolute_sigma: bool = False,
+    offset: float = None,
+    slope: float = None,
+):
+    r"""
+    Weighted linear least-squares fit of :math:`y = a + b x` from the total weight
+    :math:`S = \sum w`, the weighted means :math:`\bar{x}` and :math:`\bar{y}`,
+    and the weighted sums of products of deviations from the mean
+    :math:`c_{xy} = \sum w (x - \bar{x}) (y - \bar{y})` (etc.),
+    with the same conventions as :py:func:`_fit_linear_lsq`.
+
+    :param n: Number of data-points (with non-zero weight).
+    :param absolute_sigma: Do not scale the covariance by the residuals.
+    :param offset: Offset :math:`a` (fitted if not specified).
+    :param slope: Slope :math:`b` (fitted if not specified).
+    :return: ``(offset, slope, pcov, chi2)``, with ``chi2`` the weighted sum of squared residuals.
+    """
+
+    shape = np.broadcast_shapes(*[np.shape(i) for i in [n, S, xm, ym, cxx, cxy, cyy]])
+    pcov = np.zeros(shape + (2, 2))
+    free = np.array([offset is None, slope is None])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if offset is None and slope is None:
+            slope = cxy / cxx
+            offset = ym - slope * xm
+            pcov[..., 0, 0] = 1 / S + xm**2 / cxx
+            pcov[..., 0, 1] = -xm / cxx
+            pcov[..., 1, 0] = -xm / cxx
+            pcov[..., 1, 1] = 1 / cxx
+        elif offset is None:
+            offset = ym - slope * xm
+            pcov[..., 0, 0] = 1 / S
+        elif slope is None:
+            sxx = cxx + S * xm**2
+            slope = (cxy + S * xm * (ym - offset)) / sxx
+            pcov[..., 1, 1] = 1 / sxx
+
+        offset = np.broadcast_to(np.asarray(offset, dtype=float), shape)
+        slope = np.broadcast_to(np.asarray(slope, dtype=float), shape)
+        chi2 = cyy - 2 * slope * cxy + slope**2 * cxx + S * (ym - offset - slope * xm) ** 2
+        chi2 = np.maximum(chi2, 0)
+
+        if not absolute_sigma:
+            p = np.sum(free)
+            scale = np.where(n > p, chi2 / (n - p), np.inf)
+            pcov *= scale[..., np.newaxis, np.newaxis]
+            pcov[..., ~free, :] = 0
+            pcov[..., :, ~free] = 0
+
+    return offset[()], slope[()], pcov, chi2[()]
+
+
 def _fit_loglog(
     logx: ArrayLike,
     logy: ArrayLike,
     prefactor: float,
     exponent: float,
-    **fit_opts,
-) -> (float, float):
-    if prefactor is None and exponent is None:
+    sigma: ArrayLike = None,
+    absolute_sigma: bool = False,
+) -> (float, float, float, float, np.ndarray):
+    r"""
+    Fit :math:`\ln y = \ln c + b \ln x` (or :math:`\ln y = \ln c + b x`),
+    see :py:func:`_fit_linear_lsq`.
+
+    :return: ``(prefactor, exponent, prefactor_error, exponent_error, pcov)``
+    """
+
+    w = None if sigma is None else 1 / np.asarray(sigma, dtype=float) ** 2
+    log_prefactor = None if prefactor is None else np.log(prefactor)
+    perr = 0
+    eerr = 0
+    log_prefactor, fitted, pcov = _fit_linear_lsq(
+        logx, logy, w, absolute_sigma, log_prefactor, exponent
+    )
+
+    if prefactor is None:
+        prefactor = np.exp(log_prefactor)
+        perr = np.exp(np.sqrt(pcov[..., 0, 0]))
+
+    if exponent is None:
+        exponent = fitted
+        eerr = np.sqrt(pcov[..., 1, 1])
+
+    return prefactor, exponent, perr, eerr, pcov
+
+
+def _bootstrap_block(
+    x: np.ndarray, y: np.ndarray, w: np.ndarray, offset, slope, seed, size: int
+) -> (np.ndarray, np.ndarray):
+    """
+    Fit ``size`` bootstrap resamples of the data at once, see :py:func:`_bootstrap_linear`.
+    If the slope is free, resamples with all x identical are degenerate: their fit is ``NaN``
+    (round-off would otherwise leave a finite but meaningless slope).
+
+    :return: ``(offset, slope)`` for each resample.
+    """
+    index = np.random.default_rng(seed).integers(0, x.size, size=(size, x.size))
+    w = None if w is None else w[index]
+    free = slope is None
+    offset, slope, _ = _fit_linear_lsq(x[index], y[index], w, True, offset, slope)
+    if free:
+        degenerate = np.ptp(x[index], axis=-1) == 0
+        offset = np.where(degenerate, np.nan, offset)
+        slope = np.where(degenerate, np.nan, slope)
+    return offset, slope
+
+
+def _bootstrap_linear(
+    x: np.ndarray,
+    y: np.ndarray,
+    w: np.ndarray,
+    offset: float,
+    slope: float,
+    n: int,
+    seed: int = None,
+    workers: int = None,
+    budget: int = 2**22,
+) -> (np.ndarray, np.ndarray):
+    """
+    Bootstrap estimate of the distribution of the parameters of a linear fit
+    (see :py:func:`_fit_linear_lsq`).
+    The resamples are drawn as an index matrix, and fitted in one vectorised operation,
+    per block of resamples whose total number of data-points is at most ``budget``
+    (or one resample if that has more data-points),
+    such that the memory per block does not depend on the number of data-points.
+    Each block has its own seed (spawned from ``seed``),
+    such that the result does not depend on the number of workers.
+
+    :param x: Data points along the x-axis.
+    :param y: Data points along the y-axis.
+    :param w: Weight of each data-point (or ``None``).
+    :param offset: Offset (fitted if ``None``).
+    :param slope: Slope (fitted if ``None``).
+    :param n: Number of resamples.
+    :param seed: Seed of the random generator.
+    :param workers: Distribute the blocks over this number of processes.
+    :param budget: Maximal number of resampled data-points per block.
+    :return: ``(offset, slope)`` for each resample.
+    """
 
-        def f(logx, log_prefactor, exponent):
-            return log_prefactor + exponent * logx
+    block = max(1, budget // x.size)
+    sizes = [block] * (n // block) + ([n % block] if n % block else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(x, y, w, offset, slope, s, size) for s, size in zip(seeds, sizes)]
 
-        param, pcov = curve_fit(f, logx, logy, **fit_opts)
-        prefactor = np.exp(param[0])
-        exponent = param[1]
-        perr = np.exp(np.sqrt(pcov[0, 0]))
-        eerr = np.sqrt(pcov[1, 1])
+    if workers is None or workers <= 1:
+        ret = [_bootstrap_block(*arg) for arg in args]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
 
-    elif prefactor is None:
+        with ProcessPoolExecutor(workers) as pool:
+            ret = list(pool.map(_bootstrap_block, *zip(*args)))
 
-        def f(logx, log_prefactor):
-            return log_prefactor + exponent * logx
+    return np.concatenate([i for i, _ in ret]), np.concatenate([i for _, i in ret])
 
-        param, pcov = curve_fit(f, logx, logy, **fit_opts)
-        prefactor = np.exp(param[0])
-        perr = np.exp(np.sqrt(pcov[0, 0]))
-        eerr = 0
 
-    elif exponent is None:
-        log_prefactor = np.log(prefactor)
+def _bootstrap_loglog(
+    logx: np.ndarray,
+    logy: np.ndarray,
+    prefactor: float,
+    exponent: float,
+    sigma: np.ndarray = None,
+    n: int = 1000,
+    confidence: float = 0.95,
+    seed: int = None,
+    workers: int = None,
+) -> (np.ndarray, np.ndarray):
+    """
+    Bootstrap percentile confidence intervals of the parameters of :py:func:`_fit_loglog`.
+    Resamples for which the fit is undefined (e.g. all x identical) are dropped.
 
-        def f(logx, exponent):
-            return log_prefactor + exponent * logx
+    :return:
+        ``(prefactor_interval, exponent_interval, dropped)``,
+        each interval as ``[lower, upper]`` (``NaN`` if all resamples are dropped),
+        and the number of dropped resamples.
+    """
+    w = None if sigma is None else 1 / np.asarray(sigma, dtype=float) ** 2
+    log_prefactor = None if prefactor is None else np.log(prefactor)
+    offset, slope = _bootstrap_linear(logx, logy, w, log_prefactor, exponent, n, seed, workers)
+    keep = np.isfinite(offset) & np.isfinite(slope)
+    offset = offset[keep]
+    slope = slope[keep]
+    dropped = int(n - np.sum(keep))
 
-        param, pcov = curve_fit(f, logx, logy, **fit_opts)
-        exponent = param[0]
-        perr = 0
-        eerr = np.sqrt(pcov[0, 0])
+    if offset.size == 0:
+        return np.full(2, np.nan), np.full(2, np.nan), dropped
 
-    return prefactor, exponent, perr, eerr
+    q = 50 * np.array([1 - confidence, 1 + confidence])
+    return np.exp(np.percentile(offset, q)), np.percentile(slope, q), dropped
 
 
 def fit_powerlaw(
@@ -1409,6 +1738,10 @@ def fit_powerlaw(
     fmt: str = None,
     auto_fmt: str = None,
     extrapolate: bool | dict = False,
+    bootstrap: int = None,
+    bootstrap_confidence: float = 0.95,
+    bootstrap_seed: int = None,
+    bootstrap_workers: int = None,
     **kwargs,
 ) -> dict:
     r"""
@@ -1460,6 +1793,13 @@ def fit_powerlaw(
         Instead of ``True``, one can specify plot options for the extrapolated line, e.g.
         ``..., extrapolate=dict(ls="--", c="r"), ...``.
 
+    :param bootstrap:
+        Number of bootstrap resamples (of the data-points, with replacement)
+        used to compute percentile confidence intervals of the fitted parameters.
+    :param bootstrap_confidence: Confidence level of the bootstrap intervals.
+    :param bootstrap_seed: Seed for the bootstrap resamples (for reproducible intervals).
+    :param bootstrap_workers: Distribute the bootstrap resamples over this number of processes.
+
     :param kwargs:
         Other plot options.
 
@@ -1471,6 +1811,9 @@ def fit_powerlaw(
             prefactor_error: Estimated error of prefactor.
             exponent_error: Estimated error of exponent.
             pcov: Covariance of fit.
+            prefactor_interval: Bootstrap confidence interval of prefactor (if ``bootstrap``).
+            exponent_interval: Bootstrap confidence interval of exponent (if ``bootstrap``).
+            bootstrap_dropped: Number of resamples with an undefined fit (if ``bootstrap``).
             label: Label.
             handle: Handle of the plot (if ``axis`` was specified).
             handle_lower: Handle of the plot of the lower extrapolation, if present.
@@ -1501,9 +1844,30 @@ def fit_powerlaw(
         else:
             raise OSError("yerr_mode: did you mean 'differentials'?")
 
-    prefactor, exponent, details["prefactor_error"], details["exponent_error"] = _fit_loglog(
-        logx, logy, prefactor, exponent, **fit_opts
-    )
+    if bootstrap:
+        (
+            details["prefactor_interval"],
+            details["exponent_interval"],
+            details["bootstrap_dropped"],
+        ) = _bootstrap_loglog(
+            logx,
+            logy,
+            prefactor,
+            exponent,
+            fit_opts.get("sigma", None),
+            n=bootstrap,
+            confidence=bootstrap_confidence,
+            seed=bootstrap_seed,
+            workers=bootstrap_workers,
+        )
+
+    (
+        prefactor,
+        exponent,
+        details["prefactor_error"],
+        details["exponent_error"],
+        details["pcov"],
+    ) = _fit_loglog(logx, logy, prefactor, exponent, **fit_opts)
 
     details["prefactor"] = prefactor
     details["exponent"] = exponent
@@ -1552,6 +1916,479 @@ def fit_powerlaw(
     return details
 
 
+def _scan_windows(x, y, w, min_points, stride, block=2**20):
+    """
+    Fit :math:`y = a + b x` to all windows ``[start, stop)`` of the (sorted) data-points,
+    with ``start`` and ``stop`` multiples of ``stride`` (or the last data-point),
+    see :py:func:`_fit_linear_sums`.
+    The sums of each window are computed from cumulative sums.
+
+    :param min_points: Minimal number of data-points per window.
+    :param stride: Stride of the start and stop of the windows.
+    :param block: Maximal number of windows to consider at once.
+    :return: Per block of starts: ``(start, stop, rms, span)`` of all windows.
+    """
+
+    n = x.size
+    idx = np.unique(np.append(np.arange(0, n, stride), n))
+    x0 = np.sum(w * x) / np.sum(w)
+    y0 = np.sum(w * y) / np.sum(w)
+    x = x - x0
+    y = y - y0
+    sums = [w, w * x, w * y, w * x * x, w * x * y, w * y * y]
+    sums = [np.concatenate(([0], np.cumsum(i))) for i in sums]
+    rows = max(1, block // idx.size)
+
+    for r in range(0, idx.size - 1, rows):
+        i = idx[r : r + rows, np.newaxis]  # noqa: E203
+        j = idx[np.newaxis, :]
+        keep = j - i >= min_points
+        if not np.any(keep):
+            continue
+        i, j = np.broadcast_arrays(i, j)
+        i = i[keep]
+        j = j[keep]
+        _, _, _, chi2 = _fit_linear_sums(j - i, *[s[j] - s[i] for s in sums])
+        yield i, j, np.sqrt(chi2 / (j - i - 2)), x[j - 1] - x[i]
+
+
+def fit_powerlaw_range(
+    xdata: ArrayLike,
+    ydata: ArrayLike,
+    yerr: ArrayLike = None,
+    min_points: int = 10,
+    stride: int = 1,
+    tol: float = None,
+    **kwargs,
+) -> dict:
+    r"""
+    Find the widest range of ``xdata`` on which ``ydata`` is a powerlaw :math:`y = c x^b`,
+    and fit it using :py:func:`fit_powerlaw`.
+    All windows of consecutive (in ``xdata``) data-points are considered.
+    The goodness of fit of a window is measured as the root-mean-square residual of
+    :math:`\ln y` (in units of the error, if ``yerr`` is specified):
+
+    .. math::
+
+        r = \sqrt{ \frac{\chi^2}{n - 2} }
+
+    The selected window has the largest span :math:`\ln x_\mathrm{max} - \ln x_\mathrm{min}`
+    of all windows with :math:`r \leq` ``tol`` (and the smallest :math:`r` of equal spans).
+    The fit of each window is computed from cumulative sums, at the cost of a few operations.
+    For many data-points, use ``stride`` to limit the number of windows.
+    As for :py:func:`fit_powerlaw`, data-points with :math:`x \leq 0`, :math:`y \leq 0`,
+    or ``NaN`` values are ignored.
+
+    :param xdata: Data points along the x-axis.
+    :param ydata: Data points along the y-axis.
+    :param yerr: Error-bar for ``ydata`` (should be the standard deviation).
+    :param min_points: Minimal number of data-points per window.
+    :param stride: Only consider windows starting and stopping at every ``stride`` data-point.
+    :param tol:
+        Maximal root-mean-square residual of the selected window.
+        Default: 1.2 times the median root-mean-square residual of the windows of
+        ``min_points`` data-points, an estimate of the noise level.
+        An error is raised if no window satisfies the tolerance.
+
+    :param kwargs: Options passed to :py:func:`fit_powerlaw` (e.g. ``axis``).
+
+    :return:
+        The fit (and plot) details of :py:func:`fit_powerlaw`, and::
+
+            xmin: Lower bound of the selected range.
+            xmax: Upper bound of the selected range.
+            rms: Root-mean-square residual of the selected range.
+            tol: Tolerance used.
+    """
+
+    xdata = np.asarray(xdata, dtype=float).ravel()
+    ydata = np.asarray(ydata, dtype=float).ravel()
+    assert xdata.shape == ydata.shape
+    assert min_points >= 3
+    assert stride >= 1
+
+    x, y, w, _ = _fit_batch_weights(xdata, ydata, yerr, None, True, True)
+    keep = w > 0
+    sorter = np.argsort(x[keep], kind="stable")
+    x = x[keep][sorter]
+    y = y[keep][sorter]
+    w = w[keep][sorter]
+    xdata = xdata[keep][sorter]
+    ydata = ydata[keep][sorter]
+    if yerr is not None:
+        yerr = np.broadcast_to(np.asarray(yerr, dtype=float), keep.shape)[keep][sorter]
+
+    if x.size < min_points:
+        raise OSError(f"Less than {min_points} valid data-points")
+
+    if tol is None:
+        n = np.full(x.size - min_points + 1, min_points)
+        chi2 = _fit_linear_sums(n, *_window_sums(x, y, w, min_points)[2])[3]
+        tol = 1.2 * np.median(np.sqrt(chi2 / (min_points - 2)))
+
+    best = (-np.inf, np.inf, 0, 0)
+
+    for i, j, r, span in _scan_windows(x, y, w, min_points, stride):
+        keep = r <= tol
+        if not np.any(keep):
+            continue
+        i, j, r, span = i[keep], j[keep], r[keep], span[keep]
+        k = np.lexsort((r, -span))[0]
+        if (span[k], -r[k]) > (best[0], -best[1]):
+            best = (span[k], r[k], i[k], j[k])
+
+    if not np.isfinite(best[0]):
+        raise OSError(f"No window with a root-mean-square residual <= tol = {tol:.3e}")
+
+    _, rms, i, j = best
+    e = None if yerr is None else yerr[i:j]
+    details = fit_powerlaw(xdata[i:j], ydata[i:j], e, **kwargs)
+    details["xmin"] = xdata[i]
+    details["xmax"] = xdata[j - 1]
+    details["rms"] = rms
+    details["tol"] = tol
+    return details
+
+
+_hurwitz_zeta_bernoulli = [1 / 6, -1 / 30, 1 / 42, -1 / 30, 5 / 66, -691 / 2730, 7 / 6]
+
+
+def _hurwitz_zeta(s: ArrayLike, q: ArrayLike, terms: int = 10) -> np.ndarray:
+    r"""
+    Hurwitz zeta function :math:`\zeta(s, q) = \sum_{k = 0}^\infty (k + q)^{-s}`
+    for :math:`s > 1` and :math:`q > 0`, using Euler-Maclaurin summation:
+    the first ``terms`` terms are summed explicitly, the remainder is approximated by its integral
+    and Bernoulli corrections.
+
+    :param s: Exponent.
+    :param q: Offset.
+    :param terms: Number of terms that is summed explicitly.
+    :return: :math:`\zeta(s, q)` (broadcast shape of ``s`` and ``q``).
+    """
+    s = np.asarray(s, dtype=float)
+    q = np.asarray(q, dtype=float)
+    ret = np.zeros(np.broadcast_shapes(s.shape, q.shape))
+
+    for k in range(terms):
+        ret += (q + k) ** -s
+
+    a = q + terms
+    ret += a ** (1 - s) / (s - 1) + 0.5 * a**-s
+
+    poch = s * a ** (-s - 1)
+    fact = 2.0
+
+    for j, b in enumerate(_hurwitz_zeta_bernoulli, start=1):
+        ret += b / fact * poch
+        poch = poch * (s + 2 * j - 1) * (s + 2 * j) / a**2
+        fact *= (2 * j + 1) * (2 * j + 2)
+
+    return ret
+
+
+def _powerlaw_tail_alpha(logsum, n, xmin, discrete):
+    r"""
+    Maximum likelihood estimate of the exponent :math:`\alpha` of a powerlaw tail
+    (for discrete data: its approximation by Clauset et al.,
+    see :py:func:`_powerlaw_tail_alpha_discrete`).
+
+    :param logsum: :math:`\sum \ln x_i` of the tail.
+    :param n: Number of samples in the tail.
+    :param xmin: Lower bound of the tail.
+    :param discrete: Discrete data.
+    :return: Estimate of :math:`\alpha`.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if discrete:
+            return 1 + n / (logsum - n * np.log(xmin - 0.5))
+        return 1 + n / (logsum - n * np.log(xmin))
+
+
+def _powerlaw_tail_ks(values, index, c, xmin, alpha, discrete, ks_points, block=2**20):
+    """
+    Kolmogorov-Smirnov distance between the tail of the data and
+    a powerlaw with lower bound ``xmin`` and exponent ``alpha``.
+    The distance is evaluated at all unique values in the tail if there are at most ``ks_points``,
+    and otherwise at ``ks_points`` samples of the tail (equally spaced in rank).
+
+    :param values: Sorted unique values of the data.
+    :param index: Number of samples smaller than each value (and the total number of samples).
+    :param c: Index of the first unique value of the tail, for each candidate.
+    :param xmin: Lower bound of the tail, for each candidate.
+    :param alpha: Exponent, for each candidate.
+    :param discrete: Discrete data.
+    :param ks_points: Number of samples of the tail.
+    :param block: Maximal number of evaluations to consider at once.
+    :return: Distance, for each candidate.
+    """
+    n = index[-1]
+    u = values.size
+    ties = u < n
+    exact = u - c[0] <= ks_points
+    points = u - c[0] if exact else ks_points
+    t = np.linspace(0, 1, points)
+    rows = max(1, block // points)
+    ret = np.empty(c.size)
+
+    for r in range(0, c.size, rows):
+        ci = c[r : r + rows, np.newaxis]  # noqa: E203
+        xi = xmin[r : r + rows, np.newaxis]  # noqa: E203
+        ai = alpha[r : r + rows, np.newaxis]  # noqa: E203
+        ki = index[ci]
+        nt = n - ki
+
+        if exact:
+            j = np.minimum(ci + np.arange(points), u - 1)
+        else:
+            j = ki + np.round(t * (nt - 1)).astype(np.int64)
+            if ties:
+                j = np.searchsorted(index, j, side="right") - 1
+
+        x = values[j]
+        hi = (index[j + 1] - ki) / nt
+
+        if discrete:
+            cdf = 1 - _hurwitz_zeta(ai, x + 1) / _hurwitz_zeta(ai, xi)
+            ret[r : r + rows] = np.max(np.abs(hi - cdf), axis=1)  # noqa: E203
+        else:
+            lo = (index[j] - ki) / nt
+            cdf = 1 - (x / xi) ** (1 - ai)
+            d = np.maximum(np.abs(hi - cdf), np.abs(lo - cdf))
+            ret[r : r + rows] = np.max(d, axis=1)  # noqa: E203
+
+    return ret
+
+
+def _fit_powerlaw_tail(data, xmin, discrete, min_tail, candidates, ks_points):
+    """
+    Fit a powerlaw tail to sorted (positive) data, see :py:func:`fit_powerlaw_tail`.
+
+    :return: ``(k, xmin, alpha, ks, xmin_scan, ks_scan)`` with ``k`` the start of the tail.
+    """
+    n = data.size
+    index = np.flatnonzero(np.concatenate(([True], data[1:] != data[:-1], [True])))
+    values = data[index[:-1]]
+
+    if xmin is not None:
+        c = np.searchsorted(values, [xmin], side="left")
+        xm = np.array([xmin], dtype=float)
+    else:
+        c = np.flatnonzero(n - index[:-1] >= min_tail)
+        if c.size > candidates:
+            target = n - np.geomspace(n - index[c[0]], n - index[c[-1]], candidates)
+            i = np.searchsorted(index[c], target, side="left")
+            c = c[np.unique(np.clip(i, 0, c.size - 1))]
+        xm = values[c].astype(float)
+
+    if c.size == 0 or c[0] >= values.size or n - index[c[0]] < min_tail:
+        raise OSError(f"Less than {min_tail} samples in the tail")
+
+    # sum of the logarithm of all samples in the tail of each candidate
+    k = index[c]
+    logsum = np.add.reduceat(np.log(data), k)[::-1].cumsum()[::-1]
+    nt = n - k
+    alpha = _powerlaw_tail_alpha(logsum, nt, xm, discrete)
+
+    if discrete:
+        alpha = _powerlaw_tail_alpha_discrete(logsum, nt, xm, alpha)
+
+    ks = _powerlaw_tail_ks(values, index, c, xm, alpha, discrete, ks_points)
+    i = np.argmin(np.where(np.isfinite(ks), ks, np.inf))
+    return k[i], xm[i], alpha[i], ks[i], xm, ks
+
+
+def _powerlaw_tail_alpha_discrete(logsum, n, xmin, alpha, iterations=60):
+    r"""
+    Maximum likelihood estimate of the exponent of a discrete powerlaw tail:
+    maximise :math:`-n \ln \zeta(\alpha, x_\mathrm{min}) - \alpha \sum \ln x_i`
+    by golden-section search (the likelihood is concave in :math:`\alpha`),
+    for all candidates at once.
+
+    :param logsum: :math:`\sum \ln x_i` of the tail.
+    :param n: Number of samples in the tail.
+    :param xmin: Lower bound of the tail.
+    :param alpha: Initial estimate (the search interval is :math:`(1, 2 \alpha]`).
+    :param iterations: Number of iterations.
+    :return: Estimate of :math:`\alpha`.
+    """
+
+    def f(a):
+        return n * np.log(_hurwitz_zeta(a, xmin)) + a * logsum
+
+    g = (np.sqrt(5) - 1) / 2
+    a = np.full(np.shape(alpha), 1 + 1e-6)
+    b = 2 * np.asarray(alpha, dtype=float)
+    c = b - g * (b - a)
+    d = a + g * (b - a)
+    fc = f(c)
+    fd = f(d)
+
+    for _ in range(iterations):
+        left = fc < fd
+        a, b = np.where(left, a, c), np.where(left, d, b)
+        c, d = np.where(left, b - g * (b - a), d), np.where(left, c, a + g * (b - a))
+        fnew = f(np.where(left, c, d))
+        fc, fd = np.where(left, fnew, fd), np.where(left, fc, fnew)
+
+    return (a + b) / 2
+
+
+def _powerlaw_tail_sample_discrete(v, xmin, alpha, table=10000):
+    r"""
+    Inverse of the complementary cumulative distribution
+    :math:`P(X \geq x) = \zeta(\alpha, x) / \zeta(\alpha, x_\mathrm{min})`
+    of a discrete powerlaw, tabulated for the first ``table`` values.
+    Beyond, the continuous approximation of Clauset et al. is used.
+
+    :param v: Uniformly distributed random numbers in :math:`(0, 1]`.
+    :param xmin: Lower bound.
+    :param alpha: Exponent.
+    :param table: Number of tabulated values.
+    :return: Samples.
+    """
+    p = _hurwitz_zeta(alpha, xmin + np.arange(table)) / _hurwitz_zeta(alpha, xmin)
+    count = table - np.searchsorted(p[::-1], v, side="left")
+    approx = np.floor((xmin - 0.5) * v ** (-1 / (alpha - 1)) + 0.5)
+    return np.where(count < table, xmin + count - 1, np.maximum(approx, xmin + table - 1))
+
+
+def _powerlaw_tail_sample(below, n, xmin, alpha, discrete, seed, options):
+    """
+    Kolmogorov-Smirnov distance of the powerlaw tail fit to a synthetic data set
+    (see :py:func:`fit_powerlaw_tail`).
+
+    :param below: Samples below the tail of the original data.
+    :param n: Total number of samples.
+    :param xmin: Lower bound of the tail.
+    :param alpha: Exponent of the tail.
+    :param discrete: Discrete data.
+    :param seed: Seed of the random generator.
+    :param options: Options of :py:func:`_fit_powerlaw_tail`.
+    :return: Distance.
+    """
+    rng = np.random.default_rng(seed)
+    ntail = rng.binomial(n, (n - below.size) / n)
+    u = rng.random(ntail)
+
+    if discrete:
+        tail = _powerlaw_tail_sample_discrete(1 - u, xmin, alpha)
+    else:
+        tail = xmin * (1 - u) ** (-1 / (alpha - 1))
+
+    data = np.concatenate((rng.choice(below, size=n - ntail), tail)) if below.size else tail
+    data.sort()
+    return _fit_powerlaw_tail(data, discrete=discrete, **options)[3]
+
+
+def fit_powerlaw_tail(
+    data: ArrayLike,
+    xmin: float = None,
+    discrete: bool = False,
+    min_tail: int = 10,
+    candidates: int = 1000,
+    ks_points: int = 10000,
+    bootstrap: int = None,
+    bootstrap_seed: int = None,
+    bootstrap_workers: int = None,
+) -> dict:
+    r"""
+    Fit a powerlaw to the tail of a distribution by maximum likelihood,
+    following `Clauset, Shalizi, Newman, SIAM Rev. 51, 661 (2009)
+    <https://doi.org/10.1137/070710111>`__.
+    The probability density of the samples :math:`x \geq x_\mathrm{min}` is taken as
+
+    .. math::
+
+        p(x) \propto x^{-\alpha}
+
+    The maximum likelihood estimate of :math:`\alpha` for continuous data is
+
+    .. math::
+
+        \alpha = 1 + n \left[ \sum_{i = 1}^n \ln \frac{x_i}{x_\mathrm{min}} \right]^{-1}
+
+    For discrete (integer) data, :math:`\alpha` maximises the likelihood
+    :math:`-n \ln \zeta(\alpha, x_\mathrm{min}) - \alpha \sum_{i = 1}^n \ln x_i`
+    (with :math:`\zeta` the Hurwitz zeta function).
+
+    Unless specified, :math:`x_\mathrm{min}` is chosen as the value that minimises the
+    Kolmogorov-Smirnov distance between the tail and the fitted powerlaw.
+    The candidates are the unique values of ``data``, of which ``candidates`` are kept
+    (equally spaced in the logarithm of the number of samples in the tail).
+    The sums are computed for all candidates at once from the sorted data.
+    The distance is evaluated on ``ks_points`` samples of each tail (equally spaced in rank).
+
+    Optionally, the goodness of fit is quantified by a p-value: the fraction of synthetic data
+    sets whose distance (after the same fit procedure) is larger than that of ``data``.
+    Synthetic samples are drawn from the fitted powerlaw above :math:`x_\mathrm{min}`,
+    and from the samples of ``data`` below :math:`x_\mathrm{min}`
+    (with the probability of the respective fractions of ``data``).
+
+    :param data: Samples (non-positive samples are ignored).
+    :param xmin: Lower bound of the tail (found by a scan if not specified).
+    :param discrete: Treat ``data`` as integer data.
+    :param min_tail: Minimal number of samples in the tail.
+    :param candidates: Maximal number of candidates of :math:`x_\mathrm{min}`.
+    :param ks_points: Number of samples of the tail on which the distance is evaluated.
+    :param bootstrap: Number of synthetic data sets used to compute the p-value.
+    :param bootstrap_seed: Seed for the synthetic data sets (for a reproducible p-value).
+    :param bootstrap_workers: Distribute the synthetic data sets over this number of processes.
+
+    :return:
+        Dictionary::
+
+            alpha: Exponent.
+            alpha_error: Estimated (standard) error of alpha.
+            xmin: Lower bound of the tail.
+            n_tail: Number of samples in the tail.
+            ks: Kolmogorov-Smirnov distance.
+            p_value: Goodness of fit (if ``bootstrap``).
+            xmin_scan: Candidates of xmin.
+            ks_scan: Kolmogorov-Smirnov distance of each candidate.
+    """
+
+    data = np.sort(np.asarray(data, dtype=float), axis=None)
+    data = data[data >= 1] if discrete else data[data > 0]
+    options = dict(xmin=xmin, min_tail=min_tail, candidates=candidates, ks_points=ks_points)
+
+    k, xmin, alpha, ks, xmin_scan, ks_scan = _fit_powerlaw_tail(data, discrete=discrete, **options)
+    n = data.size - k
+
+    if discrete:
+        h = 1e-4
+        z = np.log(_hurwitz_zeta(alpha + np.array([-h, 0, h]), xmin))
+        alpha_error = 1 / np.sqrt(n * (z[0] - 2 * z[1] + z[2]) / h**2)
+    else:
+        alpha_error = (alpha - 1) / np.sqrt(n)
+
+    ret = {
+        "alpha": alpha,
+        "alpha_error": alpha_error,
+        "xmin": xmin,
+        "n_tail": n,
+        "ks": ks,
+        "xmin_scan": xmin_scan,
+        "ks_scan": ks_scan,
+    }
+
+    if bootstrap:
+        seeds = np.random.SeedSequence(bootstrap_seed).spawn(bootstrap)
+        below = data[:k]
+        args = [(below, data.size, xmin, alpha, discrete, s, options) for s in seeds]
+
+        if bootstrap_workers is None or bootstrap_workers <= 1:
+            dist = [_powerlaw_tail_sample(*arg) for arg in args]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(bootstrap_workers) as pool:
+                dist = list(pool.map(_powerlaw_tail_sample, *zip(*args)))
+
+        ret["p_value"] = np.mean(np.array(dist) >= ks)
+
+    return ret
+
+
 def fit_exp(
     xdata: ArrayLike,
     ydata: ArrayLike,
@@ -1564,6 +2401,10 @@ def fit_exp(
     fmt: str = None,
     auto_fmt: str = None,
     extrapolate: bool | dict = False,
+    bootstrap: int = None,
+    bootstrap_confidence: float = 0.95,
+    bootstrap_seed: int = None,
+    bootstrap_workers: int = None,
     **kwargs,
 ) -> dict:
     r"""
@@ -1610,6 +2451,13 @@ def fit_exp(
         Instead of ``True'', one can specify plot options for the extrapolated line, e.g.
         ``..., extrapolate=dict(ls="--", c="r"), ...``.
 
+    :param bootstrap:
+        Number of bootstrap resamples (of the data-points, with replacement)
+        used to compute percentile confidence intervals of the fitted parameters.
+    :param bootstrap_confidence: Confidence level of the bootstrap intervals.
+    :param bootstrap_seed: Seed for the bootstrap resamples (for reproducible intervals).
+    :param bootstrap_workers: Distribute the bootstrap resamples over this number of processes.
+
     :param kwargs:
         Other plot options.
 
@@ -1621,6 +2469,9 @@ def fit_exp(
             prefactor_error: Estimated error of prefactor.
             exponent_error: Estimated error of exponent.
             pcov: Covariance of fit.
+            prefactor_interval: Bootstrap confidence interval of prefactor (if ``bootstrap``).
+            exponent_interval: Bootstrap confidence interval of exponent (if ``bootstrap``).
+            bootstrap_dropped: Number of resamples with an undefined fit (if ``bootstrap``).
             label: Label.
             handle: Handle of the plot (if ``axis`` was specified).
             handle_lower: Handle of the plot of the lower extrapolation, if present.
@@ -1651,9 +2502,30 @@ def fit_exp(
         else:
             raise OSError("yerr_mode: did you mean 'differentials'?")
 
-    prefactor, exponent, details["prefactor_error"], details["exponent_error"] = _fit_loglog(
-        x, logy, prefactor, exponent, **fit_opts
-    )
+    if bootstrap:
+        (
+            details["prefactor_interval"],
+            details["exponent_interval"],
+            details["bootstrap_dropped"],
+        ) = _bootstrap_loglog(
+            x,
+            logy,
+            prefactor,
+            exponent,
+            fit_opts.get("sigma", None),
+            n=bootstrap,
+            confidence=bootstrap_confidence,
+            seed=bootstrap_seed,
+            workers=bootstrap_workers,
+        )
+
+    (
+        prefactor,
+        exponent,
+        details["prefactor_error"],
+        details["exponent_error"],
+        details["pcov"],
+    ) = _fit_loglog(x, logy, prefactor, exponent, **fit_opts)
 
     details["prefactor"] = prefactor
     details["exponent"] = exponent
@@ -1725,8 +2597,11 @@ def fit_log(
     logx = logx[~j]
     y = y[~j]
 
+    if yerr is not None:
+        yerr = np.array(yerr)[i][~j]
+
     axis = kwargs.pop("axis", None)
-    details = fit_linear(logx, y, **kwargs)
+    details = fit_linear(logx, y, yerr=yerr, **kwargs)
     offset = details["offset"]
     slope = details["slope"]
     auto_fmt = kwargs.pop("auto_fmt", None)
@@ -1833,45 +2708,20 @@ def fit_linear(
     xdata = np.array(xdata)
     ydata = np.array(ydata)
 
-    fit_opts = {}
     details = {}
+    w = None
 
     if yerr is not None:
         sigma = np.array(yerr).astype(float)
-        sigma[yerr == 0] = np.finfo(sigma.dtype).eps  # avoid zero division
-        fit_opts["sigma"] = sigma
-        fit_opts["absolute_sigma"] = absolute_sigma
-
-    if offset is None and slope is None:
-
-        def f(x, offset, slope):
-            return offset + slope * x
-
-        param, pcov = curve_fit(f, xdata, ydata, **fit_opts)
-        offset = param[0]
-        slope = param[1]
-        details["offset_error"] = np.sqrt(pcov[0, 0])
-        details["slope_error"] = np.sqrt(pcov[1, 1])
-
-    elif offset is None:
-
-        def f(x, offset):
-            return offset + slope * x
+        sigma[sigma == 0] = np.finfo(sigma.dtype).eps  # avoid zero division
+        w = 1 / sigma**2
 
-        param, pcov = curve_fit(f, xdata, ydata, **fit_opts)
-        offset = param[0]
-        details["offset_error"] = np.sqrt(pcov[0, 0])
-        details["slope_error"] = 0
-
-    elif slope is None:
-
-        def f(x, slope):
-            return offset + slope * x
-
-        param, pcov = curve_fit(f, xdata, ydata, **fit_opts)
-        slope = param[0]
-        details["offset_error"] = 0
-        details["slope_error"] = np.sqrt(pcov[0, 0])
+    fixed = {"offset": offset, "slope": slope}
+    offset, slope, details["pcov"] = _fit_linear_lsq(
+        xdata, ydata, w, absolute_sigma, offset=offset, slope=slope
+    )
+    details["offset_error"] = np.sqrt(details["pcov"][0, 0]) if fixed["offset"] is None else 0
+    details["slope_error"] = np.sqrt(details["pcov"][1, 1]) if fixed["slope"] is None else 0
 
     details["offset"] = offset
     details["slope"] = slope
@@ -1915,48 +2765,576 @@ def fit_linear(
     return details
 
 
-def random_from_cdf(shape, P, x, linspace=False, shuffle=True):
+def _fit_batch_weights(
+    xdata: ArrayLike,
+    ydata: ArrayLike,
+    yerr: ArrayLike,
+    mask: ArrayLike,
+    logx: bool,
+    logy: bool,
+    absolute_sigma: bool = True,
+):
     r"""
-    Generate a random number based on a discrete cumulative probability density function.
+    Transform data for a (batched) linear fit of :math:`Y = a + b X`,
+    with :math:`X = \ln x` if ``logx`` (else :math:`x`),
+    and :math:`Y = \ln y` if ``logy`` (else :math:`y`).
+    Data-points that are masked or for which :math:`X`, :math:`Y`, or the error are not finite
+    get zero weight (and :math:`X = Y = 0`).
 
-    :arguments:
+    :return: ``(X, Y, w, absolute_sigma)``
+    """
 
-        **shape** (```<array_like>``)
-            Shape of the output array.
+    xdata = np.asarray(xdata, dtype=float)
+    ydata = np.asarray(ydata, dtype=float)
+    xdata, ydata = np.broadcast_arrays(xdata, ydata)
+    valid = np.ones(xdata.shape, dtype=bool)
 
-        **P, x** (```<array_like>``)
-            Cumulative probability of each data point ``x``.
+    if mask is not None:
+        valid &= np.asarray(mask, dtype=bool)
 
-    :options:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.log(xdata) if logx else xdata
+        y = np.log(ydata) if logy else ydata
+        valid &= np.isfinite(x) & np.isfinite(y)
 
-        **linspace** ([``False``] | ``True``)
-            If ``True`` the cumulative probabilities of the output array are drawn from an equally
-            spaced array. Otherwise they are drawn randomly.
+        if yerr is None:
+            w = valid.astype(float)
+            absolute_sigma = False
+        else:
+            sigma = np.broadcast_to(np.asarray(yerr, dtype=float), xdata.shape)
+            sigma = sigma / ydata if logy else sigma.copy()
+            sigma[sigma == 0] = np.finfo(sigma.dtype).eps  # avoid zero division
+            w = 1 / sigma**2
+            valid &= np.isfinite(w)
 
-        **shuffle** ([``True``] | ``False``)
-            If ``True`` the output is shuffled (before reshaping), otherwise the output it sorted.
+    x = np.where(valid, x, 0)
+    y = np.where(valid, y, 0)
+    w = np.where(valid, w, 0)
+    return x, y, w, absolute_sigma
+
+
+def _fit_batch(
+    xdata: ArrayLike,
+    ydata: ArrayLike,
+    yerr: ArrayLike,
+    mask: ArrayLike,
+    logx: bool,
+    logy: bool,
+    absolute_sigma: bool,
+    offset: ArrayLike,
+    slope: ArrayLike,
+):
     """
+    Fit each row, see :py:func:`_fit_batch_weights` and :py:func:`_fit_linear_lsq`.
 
-    N = np.prod(shape)
+    :return: ``(offset, slope, pcov)``
+    """
 
-    if linspace:
-        Py = np.linspace(0, 1, N)
-    else:
-        Py = np.sort(np.random.rand(N))
+    x, y, w, absolute_sigma = _fit_batch_weights(
+        xdata, ydata, yerr, mask, logx, logy, absolute_sigma
+    )
 
-    y = np.interp(Py, P, x)
+    if offset is not None:
+        offset = np.asarray(offset, dtype=float)
+        offset = np.log(offset) if logy else offset
 
-    if shuffle:
-        np.random.shuffle(y)
+    return _fit_linear_lsq(x, y, w, absolute_sigma, offset, slope)
 
-    return y.reshape(shape)
 
+def _fit_batch_exp(offset, slope, pcov, prefactor, exponent) -> dict:
+    """
+    Details of a batched fit in log-y space (see :py:func:`_fit_batch`).
+    """
+    ret = {
+        "prefactor": np.exp(offset),
+        "exponent": slope,
+        "prefactor_error": np.zeros_like(offset)[()],
+        "exponent_error": np.zeros_like(slope)[()],
+        "pcov": pcov,
+    }
 
-def histogram_bin_edges_minwidth(min_width, bins):
-    r"""
-    Merge bins with right-neighbour until each bin has a minimum width.
+    if prefactor is not None:
+        ret["prefactor"] = np.array(np.broadcast_to(prefactor, np.shape(offset)), dtype=float)[()]
+    else:
+        ret["prefactor_error"] = np.exp(np.sqrt(pcov[..., 0, 0]))
 
-    :arguments:
+    if exponent is None:
+        ret["exponent_error"] = np.sqrt(pcov[..., 1, 1])
+
+    return ret
+
+
+def _fit_batch_linear(offset, slope, pcov, fit_offset, fit_slope) -> dict:
+    """
+    Details of a batched linear fit (see :py:func:`_fit_batch`).
+    """
+    ret = {
+        "offset": offset,
+        "slope": slope,
+        "offset_error": np.zeros_like(offset)[()],
+        "slope_error": np.zeros_like(slope)[()],
+        "pcov": pcov,
+    }
+
+    if fit_offset is None:
+        ret["offset_error"] = np.sqrt(pcov[..., 0, 0])
+
+    if fit_slope is None:
+        ret["slope_error"] = np.sqrt(pcov[..., 1, 1])
+
+    return ret
+
+
+def fit_powerlaw_batch(
+    xdata: ArrayLike,
+    ydata: ArrayLike,
+    yerr: ArrayLike = None,
+    mask: ArrayLike = None,
+    absolute_sigma: bool = True,
+    prefactor: ArrayLike = None,
+    exponent: ArrayLike = None,
+) -> dict:
+    r"""
+    Fit a powerlaw :math:`y = c x^b` to many curves at once, see :py:func:`fit_powerlaw`.
+    Each row is fitted independently (all rows are solved in one vectorised operation).
+    As for :py:func:`fit_powerlaw`, data-points with :math:`x \leq 0`, :math:`y \leq 0`,
+    or ``NaN`` values are ignored.
+    Example::
+
+        fit = gplt.fit_powerlaw_batch(x, y, mask=x > 1e-2)
+        exponent = fit["exponent"]  # one per curve
+
+    :param xdata: Data points along the x-axis ``[n_curves, n_points]`` (or ``[n_points]``).
+    :param ydata: Data points along the y-axis ``[n_curves, n_points]``.
+    :param yerr: Error-bar for ``ydata`` (treated as ``yerr_mode = "differentials"``).
+    :param mask: Per data-point: ``True`` to use it in the fit, ``False`` to ignore it.
+    :param absolute_sigma: Treat (the effective) ``yerr`` as absolute error.
+    :param prefactor: Prefactor :math:`c` (fitted if not specified), scalar or one per curve.
+    :param exponent: Exponent :math:`b` (fitted if not specified), scalar or one per curve.
+    :return:
+        The fit details as a dictionary of arrays ``[n_curves]``::
+
+            prefactor: (Fitted) prefactor.
+            exponent: (Fitted) exponent.
+            prefactor_error: Estimated error of prefactor.
+            exponent_error: Estimated error of exponent.
+            pcov: Covariance of fit [n_curves, 2, 2].
+    """
+    fit = _fit_batch(xdata, ydata, yerr, mask, True, True, absolute_sigma, prefactor, exponent)
+    return _fit_batch_exp(*fit, prefactor, exponent)
+
+
+def fit_exp_batch(
+    xdata: ArrayLike,
+    ydata: ArrayLike,
+    yerr: ArrayLike = None,
+    mask: ArrayLike = None,
+    absolute_sigma: bool = True,
+    prefactor: ArrayLike = None,
+    exponent: ArrayLike = None,
+) -> dict:
+    r"""
+    Fit an exponential :math:`y = c \exp(b x)` to many curves at once, see :py:func:`fit_exp`
+    and :py:func:`fit_powerlaw_batch` (for the arguments and the output).
+    Data-points with :math:`y \leq 0` or ``NaN`` values are ignored.
+    """
+    fit = _fit_batch(xdata, ydata, yerr, mask, False, True, absolute_sigma, prefactor, exponent)
+    return _fit_batch_exp(*fit, prefactor, exponent)
+
+
+def fit_linear_batch(
+    xdata: ArrayLike,
+    ydata: ArrayLike,
+    yerr: ArrayLike = None,
+    mask: ArrayLike = None,
+    absolute_sigma: bool = True,
+    offset: ArrayLike = None,
+    slope: ArrayLike = None,
+) -> dict:
+    r"""
+    Fit a linear function :math:`y = a + b x` to many curves at once, see :py:func:`fit_linear`
+    and :py:func:`fit_powerlaw_batch` (for the arguments).
+    Data-points with ``NaN`` values are ignored.
+
+    :return:
+        The fit details as a dictionary of arrays ``[n_curves]``::
+
+            offset: (Fitted) offset.
+            slope: (Fitted) slope.
+            offset_error: Estimated error of offset.
+            slope_error: Estimated error of slope.
+            pcov: Covariance of fit [n_curves, 2, 2].
+    """
+    fit = _fit_batch(xdata, ydata, yerr, mask, False, False, absolute_sigma, offset, slope)
+    return _fit_batch_linear(*fit, offset, slope)
+
+
+def fit_log_batch(
+    xdata: ArrayLike,
+    ydata: ArrayLike,
+    yerr: ArrayLike = None,
+    mask: ArrayLike = None,
+    absolute_sigma: bool = True,
+    offset: ArrayLike = None,
+    slope: ArrayLike = None,
+) -> dict:
+    r"""
+    Fit a logarithm :math:`y = a + b \ln x` to many curves at once, see :py:func:`fit_log`
+    and :py:func:`fit_linear_batch` (for the arguments and the output).
+    Data-points with :math:`x \leq 0` or ``NaN`` values are ignored.
+    """
+    fit = _fit_batch(xdata, ydata, yerr, mask, True, False, absolute_sigma, offset, slope)
+    return _fit_batch_linear(*fit, offset, slope)
+
+
+class FitAccumulator:
+    r"""
+    Fit of data that is added chunk-by-chunk,
+    with the same details as :py:func:`fit_linear`, :py:func:`fit_powerlaw`, :py:func:`fit_exp`,
+    or :py:func:`fit_log`.
+    Only the total weight, the weighted means, and the weighted sums of products of deviations
+    from the mean of the transformed data (e.g. :math:`\ln x` and :math:`\ln y` for a powerlaw)
+    are stored, combined chunk-wise as in :py:class:`BinAccumulator`,
+    such that the memory does not depend on the amount of data.
+    Example::
+
+        fit = gplt.FitAccumulator("powerlaw")
+
+        for filename in filenames:
+            with h5py.File(filename) as file:
+                fit.add(file["x"][...], file["y"][...])
+
+        details = fit.fit()
+        exponent = details["exponent"]
+
+    :param mode:
+        Function that is fitted:
+        * ``'linear'``: :math:`y = a + b x` (see :py:func:`fit_linear`).
+        * ``'powerlaw'``: :math:`y = c x^b` (see :py:func:`fit_powerlaw`).
+        * ``'exp'``: :math:`y = c \exp(b x)` (see :py:func:`fit_exp`).
+        * ``'log'``: :math:`y = a + b \ln x` (see :py:func:`fit_log`).
+    """
+
+    _modes = {
+        "linear": (False, False),
+        "powerlaw": (True, True),
+        "exp": (False, True),
+        "log": (True, False),
+    }
+
+    def __init__(self, mode: str = "linear"):
+        if mode not in self._modes:
+            raise OSError(f"Unknown mode '{mode}', choose from {list(self._modes)}")
+
+        self.mode = mode
+        self.logx, self.logy = self._modes[mode]
+        self.weighted = None
+        self.n = 0
+        self.weight = np.float64(0)
+        self.mean = {"x": np.float64(0), "y": np.float64(0)}
+        self.m2 = {"xx": np.float64(0), "xy": np.float64(0), "yy": np.float64(0)}
+
+    def _merge(self, n: int, weight: float, mean: dict, m2: dict, weighted: bool):
+        if n == 0:
+            return
+
+        if self.weighted is None:
+            self.weighted = weighted
+        elif self.weighted != weighted:
+            raise OSError("Specify yerr for all or for none of the data")
+
+        total = self.weight + weight
+        frac = weight / total
+        dx = mean["x"] - self.mean["x"]
+        dy = mean["y"] - self.mean["y"]
+        self.m2["xx"] += m2["xx"] + dx * dx * self.weight * frac
+        self.m2["xy"] += m2["xy"] + dx * dy * self.weight * frac
+        self.m2["yy"] += m2["yy"] + dy * dy * self.weight * frac
+        self.mean["x"] += dx * frac
+        self.mean["y"] += dy * frac
+        self.weight = total
+        self.n += n
+
+    def add(
+        self, xdata: ArrayLike, ydata: ArrayLike, yerr: ArrayLike = None, mask: ArrayLike = None
+    ):
+        """
+        Add data.
+        As for the corresponding fit function, data-points with ``NaN`` values
+        (and, for a transformed axis, non-positive values) are ignored.
+
+        :param xdata: Data points along the x-axis.
+        :param ydata: Data points along the y-axis.
+        :param yerr: Error-bar for ``ydata`` (treated as ``yerr_mode = "differentials"``).
+        :param mask: Use only data-points for which ``mask`` is ``True``.
+        """
+        xdata = np.asarray(xdata, dtype=float).ravel()
+        ydata = np.asarray(ydata, dtype=float).ravel()
+        assert xdata.shape == ydata.shape
+
+        if yerr is not None:
+            yerr = np.broadcast_to(np.asarray(yerr, dtype=float), xdata.shape)
+
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool).ravel()
+
+        x, y, w, _ = _fit_batch_weights(xdata, ydata, yerr, mask, self.logx, self.logy)
+        weight = np.sum(w)
+
+        if weight == 0:
+            return
+
+        mean = {"x": np.sum(w * x) / weight, "y": np.sum(w * y) / weight}
+        dx = np.where(w > 0, x - mean["x"], 0)
+        dy = np.where(w > 0, y - mean["y"], 0)
+        m2 = {"xx": np.sum(w * dx * dx), "xy": np.sum(w * dx * dy), "yy": np.sum(w * dy * dy)}
+        self._merge(int(np.sum(w > 0)), weight, mean, m2, yerr is not None)
+
+    def merge(self, other: FitAccumulator):
+        """
+        Add the data of another accumulator of the same mode.
+
+        :param other: Accumulator.
+        """
+        if self.mode != other.mode:
+            raise OSError("Modes must be identical")
+
+        self._merge(other.n, other.weight, other.mean, other.m2, other.weighted)
+
+    def fit(self, absolute_sigma: bool = True, **kwargs) -> dict:
+        """
+        Fit of all data added so far.
+
+        :param absolute_sigma:
+            Treat (the effective) ``yerr`` as absolute error
+            (ignored if no ``yerr`` was specified).
+
+        :param kwargs:
+            Fixed parameters:
+            ``prefactor`` and/or ``exponent`` for modes ``'powerlaw'`` and ``'exp'``,
+            ``offset`` and/or ``slope`` for modes ``'linear'`` and ``'log'``.
+
+        :return:
+            The fit details as the corresponding fit function (without plot details), e.g.
+            "prefactor", "exponent", "prefactor_error", "exponent_error", "pcov".
+            Without data, the fitted parameters are ``NaN``.
+        """
+        names = ["prefactor", "exponent"] if self.logy else ["offset", "slope"]
+        offset = kwargs.pop(names[0], None)
+        slope = kwargs.pop(names[1], None)
+
+        if len(kwargs) > 0:
+            raise OSError(f"Unknown parameters {list(kwargs)}, choose from {names}")
+
+        fit = _fit_linear_moments(
+            self.n,
+            self.weight,
+            self.mean["x"],
+            self.mean["y"],
+            self.m2["xx"],
+            self.m2["xy"],
+            self.m2["yy"],
+            absolute_sigma and bool(self.weighted),
+            None if offset is None else (np.log(offset) if self.logy else offset),
+            slope,
+        )
+
+        if self.logy:
+            return _fit_batch_exp(*fit[:3], offset, slope)
+
+        return _fit_batch_linear(*fit[:3], offset, slope)
+
+
+def _window_sums(x: ArrayLike, y: ArrayLike, w: ArrayLike, window: int):
+    r"""
+    Weighted sums :math:`(S, S_x, S_y, S_{xx}, S_{xy}, S_{yy})` (see :py:func:`_fit_linear_sums`)
+    of each window of ``window`` consecutive data-points, from cumulative sums.
+    To limit round-off, the data are taken relative to a reference per block of ``window``
+    data-points (the weighted mean of the block).
+    A window spans at most two blocks: the sums of the second block are shifted to the reference
+    of the first.
+
+    :param x: Data points along the x-axis.
+    :param y: Data points along the y-axis.
+    :param w: Weight of each data-point.
+    :param window: Number of data-points per window.
+    :return: ``(rx, ry, sums)`` with the reference ``(rx, ry)`` of each window.
+    """
+
+    n = x.size
+    start = np.arange(0, n, window)
+    block = np.arange(n) // window
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        S = np.add.reduceat(w, start)
+        rx = np.where(S > 0, np.add.reduceat(w * x, start) / S, 0)
+        ry = np.where(S > 0, np.add.reduceat(w * y, start) / S, 0)
+
+    dx = x - rx[block]
+    dy = y - ry[block]
+    sums = [w, w * dx, w * dy, w * dx * dx, w * dx * dy, w * dy * dy]
+    sums = [np.concatenate(([0], np.cumsum(i))) for i in sums]
+
+    i = np.arange(n - window + 1)
+    j = i + window
+    b = i // window
+    k = np.minimum((b + 1) * window, j)
+    c = np.minimum(b + 1, start.size - 1)
+    S, Sx, Sy, Sxx, Sxy, Syy = [s[k] - s[i] for s in sums]
+    T, Tx, Ty, Txx, Txy, Tyy = [s[j] - s[k] for s in sums]
+    hx = rx[c] - rx[b]
+    hy = ry[c] - ry[b]
+
+    S += T
+    Sx += Tx + hx * T
+    Sy += Ty + hy * T
+    Sxx += Txx + 2 * hx * Tx + hx**2 * T
+    Sxy += Txy + hx * Ty + hy * Tx + hx * hy * T
+    Syy += Tyy + 2 * hy * Ty + hy**2 * T
+
+    return rx[b], ry[b], (S, Sx, Sy, Sxx, Sxy, Syy)
+
+
+def local_exponent(
+    xdata: ArrayLike,
+    ydata: ArrayLike,
+    window: int = 10,
+    yerr: ArrayLike = None,
+    absolute_sigma: bool = True,
+) -> dict:
+    r"""
+    Local exponent :math:`b = \mathrm{d} \ln y / \mathrm{d} \ln x`
+    from a fit of a powerlaw :math:`y = c x^b` (see :py:func:`fit_powerlaw`)
+    to each window of ``window`` consecutive data-points.
+    A plateau indicates a scaling regime, see :py:func:`plot_local_exponent`.
+    Example::
+
+        data = gplt.local_exponent(x, y, window=20)
+        gplt.plot_local_exponent(data, axis=ax)
+        ax.set_xscale("log")
+
+    The weighted sums that determine the fit are computed as cumulative sums,
+    such that each window costs :math:`\mathcal{O}(1)` operations.
+    As for :py:func:`fit_powerlaw`, data-points with :math:`x \leq 0`, :math:`y \leq 0`,
+    or ``NaN`` values are ignored (a window then has fewer data-points).
+
+    :param xdata: Data points along the x-axis (sorted).
+    :param ydata: Data points along the y-axis.
+    :param window: Number of data-points per window.
+    :param yerr: Error-bar for ``ydata`` (treated as ``yerr_mode = "differentials"``).
+    :param absolute_sigma: Treat (the effective) ``yerr`` as absolute error.
+    :return:
+        Dictionary with for each window (``len(xdata) - window + 1``)::
+
+            x: Centre of the window (geometric mean of x).
+            exponent: Local exponent.
+            exponent_error: Estimated error of exponent.
+            n: Number of data-points used.
+    """
+
+    xdata = np.asarray(xdata, dtype=float).ravel()
+    ydata = np.asarray(ydata, dtype=float).ravel()
+    assert xdata.shape == ydata.shape
+    assert window >= 2
+
+    if xdata.size < window:
+        return {key: np.empty(0) for key in ["x", "exponent", "exponent_error", "n"]}
+
+    x, y, w, absolute_sigma = _fit_batch_weights(
+        xdata, ydata, yerr, None, True, True, absolute_sigma
+    )
+
+    count = np.concatenate(([0], np.cumsum(w > 0)))
+    count = count[window:] - count[:-window]
+    rx, ry, sums = _window_sums(x, y, w, window)
+    _, slope, pcov, _ = _fit_linear_sums(count, *sums, absolute_sigma=absolute_sigma)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xm = sums[1] / sums[0]
+
+    return {
+        "x": np.exp(xm + rx),
+        "exponent": slope,
+        "exponent_error": np.sqrt(pcov[..., 1, 1]),
+        "n": count,
+    }
+
+
+def plot_local_exponent(data: dict, **kwargs) -> dict:
+    """
+    Plot the local exponent from :py:func:`local_exponent`,
+    with a band of plus and minus its estimated error.
+
+    :param data: Output of :py:func:`local_exponent`.
+    :param axis: Axis to plot in (default: current axis).
+    :param fill: Options passed to ``fill_between`` (``False`` to skip the band).
+    :param kwargs: Options passed to ``plot``.
+    :return: Dictionary with handles "handle" and "handle_fill" (if plotted).
+    """
+
+    import matplotlib.pyplot as plt
+
+    axis = kwargs.pop("axis", None)
+    axis = axis if axis else plt.gca()
+    fill = kwargs.pop("fill", {})
+
+    x = data["x"]
+    y = data["exponent"]
+    e = data["exponent_error"]
+    ret = {"handle": axis.plot(x, y, **kwargs)}
+
+    if fill is not False:
+        fill = dict(fill)
+        fill.setdefault("color", ret["handle"][0].get_color())
+        fill.setdefault("alpha", 0.3)
+        fill.setdefault("linewidth", 0)
+        ret["handle_fill"] = axis.fill_between(x, y - e, y + e, **fill)
+
+    return ret
+
+
+def random_from_cdf(shape, P, x, linspace=False, shuffle=True):
+    r"""
+    Generate a random number based on a discrete cumulative probability density function.
+
+    :arguments:
+
+        **shape** (```<array_like>``)
+            Shape of the output array.
+
+        **P, x** (```<array_like>``)
+            Cumulative probability of each data point ``x``.
+
+    :options:
+
+        **linspace** ([``False``] | ``True``)
+            If ``True`` the cumulative probabilities of the output array are drawn from an equally
+            spaced array. Otherwise they are drawn randomly.
+
+        **shuffle** ([``True``] | ``False``)
+            If ``True`` the output is shuffled (before reshaping), otherwise the output it sorted.
+    """
+
+    N = np.prod(shape)
+
+    if linspace:
+        Py = np.linspace(0, 1, N)
+    else:
+        Py = np.sort(np.random.rand(N))
+
+    y = np.interp(Py, P, x)
+
+    if shuffle:
+        np.random.shuffle(y)
+
+    return y.reshape(shape)
+
+
+def histogram_bin_edges_minwidth(min_width, bins):
+    r"""
+    Merge bins with right-neighbour until each bin has a minimum width.
+
+    :arguments:
 
         **bins** (``<array_like>``)
             The bin-edges.
@@ -1971,21 +3349,27 @@ def histogram_bin_edges_minwidth(min_width, bins):
     if min_width is False:
         return bins
 
-    # keep removing where needed
-    while True:
-        idx = np.where(np.diff(bins) < min_width)[0]
+    bins = np.asarray(bins)
 
-        if len(idx) == 0:
-            return bins
+    if np.all(np.diff(bins) >= min_width):
+        return bins
 
-        idx = idx[0]
+    # sweep left to right: keep an edge as soon as the bin it closes is wide enough
+    edges = bins.tolist()
+    keep = [0]
 
-        if idx + 1 == len(bins) - 1:
-            bins = np.hstack((bins[:idx], bins[-1]))
+    for i in range(1, len(edges)):
+        if edges[i] - edges[keep[-1]] >= min_width:
+            keep.append(i)
+
+    # the last bin is too narrow: merge with its left-neighbour
+    if keep[-1] != len(edges) - 1:
+        if len(keep) > 1:
+            keep[-1] = len(edges) - 1
         else:
-            j = idx + 1
-            k = idx + 2
-            bins = np.hstack((bins[:j], bins[k:]))
+            keep.append(len(edges) - 1)
+
+    return bins[keep]
 
 
 def histogram_bin_edges_mincount(data, min_count, bins):
@@ -2014,25 +3398,30 @@ def histogram_bin_edges_mincount(data, min_count, bins):
     if not isinstance(min_count, int):
         raise OSError('"min_count" must be an integer number')
 
-    # keep removing where needed
-    while True:
-        P, _ = np.histogram(data, bins=bins, density=False)
+    # histogram once: counts are additive, such that merging can be done on the counts
+    P, edges = np.histogram(data, bins=bins, density=False)
 
-        idx = np.where(P < min_count)[0]
+    if np.all(P >= min_count):
+        return bins
 
-        if len(idx) == 0:
-            return bins
+    # sweep left to right: close a bin as soon as it has accumulated enough data-points
+    keep = [0]
+    n = 0
 
-        idx = idx[0]
+    for i, p in enumerate(P):
+        n += p
+        if n >= min_count:
+            keep.append(i + 1)
+            n = 0
 
-        if idx + 1 == len(P):
-            bins = np.hstack((bins[:idx], bins[-1]))
+    # the last bin has too few data-points: merge with its left-neighbour
+    if keep[-1] != len(P):
+        if len(keep) > 1:
+            keep[-1] = len(P)
         else:
-            j = idx + 1
-            k = idx + 2
-            bins = np.hstack((bins[:j], bins[k:]))
+            keep.append(len(P))
 
-    return bins
+    return edges[keep]
 
 
 def histogram_bin_edges_integer(bin_edges):
@@ -2059,6 +3448,63 @@ def histogram_bin_edges_integer(bin_edges):
     return bin_edges[i]
 
 
+def _order_statistics(data: ArrayLike, rank: ArrayLike) -> np.ndarray:
+    r"""
+    Equivalent of ``np.sort(data)[rank]`` that does not sort all data.
+    The data is recursively partitioned around the middle of the requested ranks,
+    such that the cost is :math:`\mathcal{O}(n \log m)` for :math:`m` ranks
+    (``np.partition`` with several ``kth`` selects them one-by-one, which is much slower).
+
+    :param data: Data (flattened).
+    :param rank: Rank(s).
+    :return: Value(s).
+    """
+
+    data = np.ravel(data)
+    rank, inverse = np.unique(rank, return_inverse=True)
+    ret = np.empty(rank.size, dtype=data.dtype)
+    stack = [(data, 0, 0, rank.size)]
+
+    while stack:
+        a, offset, start, stop = stack.pop()
+        m = (start + stop) // 2
+        k = rank[m] - offset
+        a = np.partition(a, k)
+        ret[m] = a[k]
+        if start < m:
+            stack.append((a[:k], offset, start, m))
+        if m + 1 < stop:
+            stack.append((a[k + 1 :], offset + k + 1, m + 1, stop))  # noqa: E203
+
+    return ret[inverse]
+
+
+def _histogram_uniform_rank(size: int, bins: int) -> np.ndarray:
+    """
+    Rank (index in the sorted data) of the bin-edges of ``bins`` bins
+    with a uniform number of data-points per bin.
+
+    :param size: Number of data-points.
+    :param bins: Number of bins.
+    :return: Rank of each bin-edge [bins + 1].
+    """
+
+    # number of data-points in each bin (equal for each)
+    count = int(np.floor(float(size) / float(bins))) * np.ones(bins, dtype="int")
+
+    # increase the number of data-points by one is an many bins as needed,
+    # such that the total fits the total number of data-points
+    count[np.linspace(0, bins - 1, size - np.sum(count)).astype(int)] += 1
+
+    # split the data
+    idx = np.empty((bins + 1), dtype="int")
+    idx[0] = 0
+    idx[1:] = np.cumsum(count)
+    idx[-1] = size - 1
+
+    return idx
+
+
 def histogram_bin_edges(
     data,
     bins=10,
@@ -2085,7 +3531,8 @@ def histogram_bin_edges(
             Mode with which to compute the bin-edges:
             * ``'equal'``: each bin has equal width.
             * ``'log'``: logarithmic spacing.
-            * ``'uniform'``: uniform number of data-points per bin.
+            * ``'uniform'``: uniform number of data-points per bin
+              (for data that does not fit in memory see :py:func:`QuantileSketch.bin_edges`).
             * ``'voronoi'``: each bin is the region between two adjacent data-points.
 
         **min_count** (``<int>``)
@@ -2126,21 +3573,9 @@ def histogram_bin_edges(
                 raise OSError('"min_count" must be an integer number')
             bins = int(np.floor(float(len(data)) / float(min_count)))
 
-        # - number of data-points in each bin (equal for each)
-        count = int(np.floor(float(len(data)) / float(bins))) * np.ones(bins, dtype="int")
-
-        # - increase the number of data-points by one is an many bins as needed,
-        #   such that the total fits the total number of data-points
-        count[np.linspace(0, bins - 1, len(data) - np.sum(count)).astype(int)] += 1
-
-        # - split the data
-        idx = np.empty((bins + 1), dtype="int")
-        idx[0] = 0
-        idx[1:] = np.cumsum(count)
-        idx[-1] = len(data) - 1
-
-        # - determine the bin-edges
-        bin_edges = np.unique(np.sort(data)[idx])
+        # - determine the bin-edges: select the order statistics (no full sort needed)
+        idx = _histogram_uniform_rank(len(data), bins)
+        bin_edges = np.unique(_order_statistics(data, idx))
 
     elif mode == "voronoi":
         mid_points = np.unique(data)
@@ -2179,6 +3614,357 @@ def histogram_bin_edges(
     return bin_edges
 
 
+class QuantileSketch:
+    r"""
+    Approximate quantiles of data that is added chunk-by-chunk, using a fixed amount of memory.
+    Sketches computed on different processes can be combined using :py:func:`QuantileSketch.merge`.
+    Example: bin-edges with a uniform number of data-points per bin
+    (see :py:func:`histogram_bin_edges`, ``mode="uniform"``)::
+
+        sketch = gplt.QuantileSketch()
+
+        for filename in filenames:
+            with h5py.File(filename) as file:
+                sketch.add(file["data"][...])
+
+        bin_edges = sketch.bin_edges(bins=50)
+
+    The sketch is a hierarchy of compactors (as in the KLL sketch,
+    `Karnin et al. 2016 <https://arxiv.org/abs/1603.05346>`__):
+    level :math:`h` stores items that each represent :math:`2^h` data-points.
+    Once a level holds :math:`k` or more items, they are sorted and every other item is promoted
+    to the next level (alternating between even and odd items).
+    Each compaction introduces an error of at most :math:`2^h` in the rank of any value,
+    and level :math:`h` is compacted at most :math:`n / (k 2^h)` times.
+    The error in the rank of any quantile is therefore bounded by (see :py:attr:`rank_error`):
+
+    .. math::
+
+        \frac{\delta r}{n} \leq \frac{H}{k}
+
+    with :math:`n` the number of data-points and :math:`H \leq \log_2(n / k) + 1` the number of
+    levels. In practice, the error is much smaller since the errors largely cancel.
+    The minimum and the maximum are tracked exactly.
+    The memory is :math:`\mathcal{O}(k H)` (plus the size of the chunk that is added).
+
+    :param k: Capacity of each level (the larger, the more accurate).
+    """
+
+    def __init__(self, k: int = 4096):
+        assert k >= 2
+        self.k = int(k)
+        self.size = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0, dtype=float)]
+        self.offset = [0]
+
+    def _compress(self):
+        h = 0
+
+        while h < len(self.levels):
+            items = self.levels[h]
+
+            if items.size < self.k:
+                h += 1
+                continue
+
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype=float))
+                self.offset.append(0)
+
+            # sort, promote every other item, keep one item if the number of items is odd
+            items = np.sort(items)
+            n = items.size - items.size % 2
+            promote = items[self.offset[h] : n : 2]  # noqa: E203
+            self.offset[h] = 1 - self.offset[h]
+            self.levels[h] = items[n:]
+            self.levels[h + 1] = np.concatenate((self.levels[h + 1], promote))
+            h += 1
+
+    def add(self, data: ArrayLike):
+        """
+        Add data to the sketch.
+
+        :param data: Data (flattened, ``NaN`` values are ignored).
+        """
+        data = np.asarray(data, dtype=float).ravel()
+        data = data[~np.isnan(data)]
+
+        if data.size == 0:
+            return
+
+        self.size += data.size
+        self.min = min(self.min, np.min(data))
+        self.max = max(self.max, np.max(data))
+        self.levels[0] = np.concatenate((self.levels[0], data))
+        self._compress()
+
+    def merge(self, other: QuantileSketch):
+        """
+        Add the data of another sketch (with the same capacity ``k``).
+
+        :param other: Sketch.
+        """
+        if self.k != other.k:
+            raise OSError("Capacity of both sketches must be identical")
+
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0, dtype=float))
+                self.offset.append(0)
+            self.levels[h] = np.concatenate((self.levels[h], items))
+
+        self.size += other.size
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    @property
+    def rank_error(self) -> float:
+        """
+        Upper bound of the error in the rank of any quantile (relative to the number of items).
+        """
+        return (len(self.levels) - 1) / self.k
+
+    def to_dict(self) -> dict:
+        """
+        State of the sketch as a flat dictionary of scalars and arrays,
+        e.g. to store with ``numpy.savez`` or in an HDF5 file.
+        Restore using :py:func:`QuantileSketch.from_dict`.
+
+        :return: Dictionary.
+        """
+        ret = {"k": self.k, "size": self.size, "min": self.min, "max": self.max}
+        ret["offset"] = np.array(self.offset, dtype=np.int64)
+        for h, items in enumerate(self.levels):
+            ret[f"level{h:d}"] = items
+        return ret
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Restore a sketch stored using :py:func:`QuantileSketch.to_dict`.
+
+        :param data: Dictionary (or e.g. the output of ``numpy.load``).
+        :return: Sketch.
+        """
+        self = cls(k=int(data["k"]))
+        self.size = int(data["size"])
+        self.min = float(data["min"])
+        self.max = float(data["max"])
+        self.offset = [int(i) for i in data["offset"]]
+        self.levels = [np.array(data[f"level{h:d}"], dtype=float) for h in range(len(self.offset))]
+        return self
+
+    def sorted(self) -> (np.ndarray, np.ndarray):
+        """
+        Sorted items and the number of data-points that each item represents.
+
+        :return: ``(x, weight)``
+        """
+        x = np.concatenate(self.levels)
+        w = [np.full(items.size, 2**h, dtype=np.int64) for h, items in enumerate(self.levels)]
+        w = np.concatenate(w)
+        i = np.argsort(x, kind="stable")
+        return x[i], w[i]
+
+    def rank_quantile(self, rank: ArrayLike) -> np.ndarray:
+        """
+        Approximate value at a certain rank,
+        i.e. the equivalent of ``np.sort(data)[rank]`` (with ``0 <= rank < size``).
+
+        :param rank: Rank(s).
+        :return: Value(s).
+        """
+        assert self.size > 0
+        x, w = self.sorted()
+        rank = np.asarray(rank)
+        ret = x[np.minimum(np.searchsorted(np.cumsum(w), rank, side="right"), x.size - 1)]
+        ret = np.where(rank <= 0, self.min, ret)
+        return np.where(rank >= self.size - 1, self.max, ret)
+
+    def quantile(self, q: ArrayLike) -> np.ndarray:
+        """
+        Approximate quantile(s), see
+        `numpy.quantile <https://numpy.org/doc/stable/reference/generated/numpy.quantile.html>`__
+        (``method="inverted_cdf"``).
+
+        :param q: Probability (or sequence of probabilities), between zero and one.
+        :return: Quantile(s).
+        """
+        rank = np.ceil(np.asarray(q) * self.size).astype(np.int64) - 1
+        return self.rank_quantile(rank)
+
+    def bin_edges(self, bins: int = 10, min_count: int = None) -> np.ndarray:
+        """
+        Approximate bin-edges with a uniform number of data-points per bin,
+        see :py:func:`histogram_bin_edges` (``mode="uniform"``).
+
+        :param bins: The number of bins.
+        :param min_count: Use the minimum number of data-points per bin to set the number of bins.
+        :return: The bin-edges.
+        """
+        if min_count is not None and min_count is not False:
+            if not isinstance(min_count, int):
+                raise OSError('"min_count" must be an integer number')
+            bins = int(np.floor(float(self.size) / float(min_count)))
+
+        return np.unique(self.rank_quantile(_histogram_uniform_rank(self.size, bins)))
+
+
+class CDFSketch(QuantileSketch):
+    r"""
+    Approximate (complementary) cumulative distribution of data that is added chunk-by-chunk,
+    see :py:func:`cdf` and :py:func:`ccdf`.
+    Sketches computed on different processes (e.g. on a shard of the data each) can be combined
+    using :py:func:`CDFSketch.merge`, or stored using :py:func:`CDFSketch.to_dict`.
+    Example::
+
+        sketch = gplt.CDFSketch(tail=1000)
+
+        for filename in filenames:
+            with h5py.File(filename) as file:
+                sketch.add(file["data"][...])
+
+        P, X = sketch.ccdf()
+
+    The bulk of the distribution is approximated by a :py:class:`QuantileSketch`:
+    the error in :math:`P` is bounded by :py:attr:`rank_error`.
+    In addition, the ``tail`` largest values are stored,
+    such that :math:`P` is exact for all values larger than the smallest of them.
+
+    :param k: Capacity of each level of the sketch (the larger, the more accurate).
+    :param tail: Number of largest values that is tracked exactly.
+    """
+
+    def __init__(self, k: int = 4096, tail: int = 1000):
+        super().__init__(k=k)
+        assert tail >= 1
+        self.tail = int(tail)
+        self.top = np.empty(0, dtype=float)
+
+    def _add_top(self, data: np.ndarray):
+        top = np.concatenate((self.top, data))
+        if top.size > self.tail:
+            top = np.partition(top, top.size - self.tail)[-self.tail :]  # noqa: E203
+        self.top = top
+
+    def add(self, data: ArrayLike):
+        """
+        Add data to the sketch.
+
+        :param data: Data (flattened, ``NaN`` values are ignored).
+        """
+        data = np.asarray(data, dtype=float).ravel()
+        data = data[~np.isnan(data)]
+        super().add(data)
+        self._add_top(data)
+
+    def merge(self, other: CDFSketch):
+        """
+        Add the data of another sketch (with the same ``k`` and ``tail``).
+
+        :param other: Sketch.
+        """
+        if self.tail != other.tail:
+            raise OSError("Tail of both sketches must be identical")
+
+        super().merge(other)
+        self._add_top(other.top)
+
+    def to_dict(self) -> dict:
+        """
+        State of the sketch as a flat dictionary of scalars and arrays,
+        see :py:func:`QuantileSketch.to_dict`.
+
+        :return: Dictionary.
+        """
+        ret = super().to_dict()
+        ret["tail"] = self.tail
+        ret["top"] = self.top
+        return ret
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Restore a sketch stored using :py:func:`CDFSketch.to_dict`.
+
+        :param data: Dictionary (or e.g. the output of ``numpy.load``).
+        :return: Sketch.
+        """
+        self = super().from_dict(data)
+        self.tail = int(data["tail"])
+        self.top = np.array(data["top"], dtype=float)
+        return self
+
+    def _index(self) -> (np.ndarray, np.ndarray):
+        """
+        Unique values and (approximately) the number of samples smaller than each value.
+        See :py:func:`_unique_index`.
+        """
+        if self.size <= self.tail:
+            return _unique_index(self.top)
+
+        top = np.sort(self.top)
+        threshold = top[0]
+
+        # bulk: items of the sketch, with the number of samples that each represents
+        x, w = self.sorted()
+        start = np.empty(x.size + 1, dtype=bool)
+        start[0] = True
+        start[-1] = True
+        np.not_equal(x[1:], x[:-1], out=start[1:-1])
+        i = np.flatnonzero(start)
+        index = np.concatenate(([0], np.cumsum(w)))[i[:-1]]
+        values = x[i[:-1]]
+        keep = values <= threshold
+        values = values[keep]
+        index = index[keep]
+
+        # tail: exact, the number of samples smaller than x is size - (number of samples >= x)
+        tail = np.unique(top[top > threshold])
+        tail_index = self.size - top.size + np.searchsorted(top, tail, side="left")
+        if tail.size > 0:
+            index = np.minimum(index, tail_index[0])
+
+        values = np.concatenate((values, tail))
+        index = np.concatenate((index, tail_index, [self.size]))
+        return values, index
+
+    def cdf(self, less_equal: bool = False, dtype=None) -> (np.ndarray, np.ndarray):
+        """
+        Approximate cumulative distribution function, see :py:func:`cdf`.
+
+        :param less_equal: If ``True`` return ``P(x <= X)``, if ``False return ``P(x < X)``.
+        :param dtype: Data-type of the probabilities (default: ``float64``).
+        :return: ``(P, X)``
+        """
+        bin_edges, index = self._index()
+
+        if less_equal:
+            return np.divide(index[1:], index[-1], dtype=dtype), bin_edges
+        else:
+            return np.divide(index[:-1], index[-1], dtype=dtype), bin_edges
+
+    def ccdf(self, greater_equal: bool = True, dtype=None) -> (np.ndarray, np.ndarray):
+        """
+        Approximate complementary cumulative distribution function, see :py:func:`ccdf`.
+
+        :param greater_equal: If ``True`` return ``P(x >= X)``, if ``False return ``P(x > X)``.
+        :param dtype: Data-type of the probabilities (default: ``float64``).
+        :return: ``(P, X)``
+        """
+        bin_edges, index = self._index()
+        n = index[-1]
+        index = np.subtract(n, index, out=index)
+
+        if greater_equal:
+            return np.divide(index[:-1], n, dtype=dtype), bin_edges
+        else:
+            return np.divide(index[1:], n, dtype=dtype), bin_edges
+
+
 def histogram_norm(count: ArrayLike, bin_edges: ArrayLike, norm: float = 1.0):
     """
     (Re)normalise a histogram.
@@ -2240,7 +4026,111 @@ def histogram_bin_edges2midpoint(bin_edges: ArrayLike):
     return 0.5 * np.diff(bin_edges) + bin_edges[:-1]
 
 
-def histogram(data, return_edges=True, **kwargs):
+def _map_chunks(func: callable, data: ArrayLike, workers: int) -> list:
+    """
+    Apply a function to ``workers`` chunks of the (flattened) data using a pool of threads.
+    This is only effective for functions that release the GIL (as most numpy functions do).
+
+    :param func: Function to apply to each chunk.
+    :param data: Data.
+    :param workers: Number of threads.
+    :return: List with the result for each chunk.
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(func, np.array_split(np.ravel(data), workers)))
+
+
+def _histogram(data: ArrayLike, workers: int = None, **kwargs) -> (np.ndarray, np.ndarray):
+    """
+    ``numpy.histogram``, optionally computed in chunks on several threads.
+    The output is identical to that of ``numpy.histogram``.
+    Weighted histograms are always computed serially (to avoid a different summation order).
+
+    :param data: Data.
+    :param workers: Number of threads (serial if ``None``).
+    :param kwargs: Options passed to ``numpy.histogram``.
+    :return: ``(P, bin_edges)``
+    """
+
+    if workers is None or workers <= 1 or kwargs.get("weights", None) is not None:
+        return np.histogram(data, **kwargs)
+
+    bins = kwargs.pop("bins", 10)
+    density = kwargs.pop("density", None)
+    kwargs.pop("weights", None)
+    bin_edges = np.histogram_bin_edges(data, bins=bins, **kwargs)
+
+    # equal bins: use the same (fast) algorithm as numpy.histogram
+    if isinstance(bins, int):
+        opts = dict(bins=bins, range=(bin_edges[0], bin_edges[-1]))
+    else:
+        opts = dict(bins=bin_edges)
+
+    P = sum(_map_chunks(lambda chunk: np.histogram(chunk, **opts)[0], data, workers))
+
+    if density:
+        db = np.array(np.diff(bin_edges), float)
+        return P / db / P.sum(), bin_edges
+
+    return P, bin_edges
+
+
+def _unique_counts(data: ArrayLike, workers: int = None) -> (np.ndarray, np.ndarray):
+    """
+    Sorted unique values and the number of times each occurs,
+    optionally computed in chunks on several threads.
+
+    :param data: Data.
+    :param workers: Number of threads (serial if ``None``).
+    :return: ``(values, count)``
+    """
+
+    if workers is None or workers <= 1:
+        return np.unique(data, return_counts=True)
+
+    parts = _map_chunks(lambda chunk: np.unique(chunk, return_counts=True), data, workers)
+    values, index = np.unique(np.concatenate([v for v, _ in parts]), return_inverse=True)
+    count = np.zeros(values.size, dtype=np.int64)
+    np.add.at(count, index, np.concatenate([c for _, c in parts]))
+    return values, count
+
+
+def _unique_index(data: ArrayLike, workers: int = None) -> (np.ndarray, np.ndarray):
+    """
+    Sorted unique values and, for each value, the number of samples smaller than it.
+    Serially this uses a single sort followed by run-length encoding.
+
+    :param data: Data.
+    :param workers: Number of threads (serial if ``None``).
+    :return:
+        ``(values, index)``, with ``index`` one entry longer than ``values``:
+        ``index[i]`` is the number of samples ``< values[i]``, ``index[-1]`` is the total number.
+    """
+
+    if workers is not None and workers > 1:
+        values, count = _unique_counts(data, workers)
+        index = np.zeros(values.size + 1, dtype=np.int64)
+        np.cumsum(count, out=index[1:])
+        return values, index
+
+    data = np.sort(data, axis=None)
+    start = np.empty(data.size + 1, dtype=bool)
+    start[0] = True
+    start[-1] = True
+    np.not_equal(data[1:], data[:-1], out=start[1:-1])
+
+    # NaNs (sorted last) are counted as one value, as by numpy.unique
+    if data.dtype.kind == "f" and data.size > 0 and np.isnan(data[-1]):
+        start[np.searchsorted(data, np.nan) + 1 : -1] = False  # noqa: E203
+
+    index = np.flatnonzero(start)
+    return data[index[:-1]], index
+
+
+def histogram(data, return_edges=True, workers=None, **kwargs):
     r"""
     Compute histogram.
     This function passes all options to
@@ -2248,9 +4138,13 @@ def histogram(data, return_edges=True, **kwargs):
     In addition you can use:
 
     :param return_edges: Return the bin edges if set to ``True``, return their midpoints otherwise.
+    :param workers:
+        Compute the histogram in chunks on this number of threads.
+        The result is identical to the serial computation.
+        Weighted histograms are computed serially.
     """
 
-    P, bin_edges = np.histogram(data, **kwargs)
+    P, bin_edges = _histogram(data, workers=workers, **kwargs)
 
     if return_edges:
         return P, bin_edges
@@ -2272,13 +4166,16 @@ def histogram_cumulative(data, **kwargs):
         **normalize** ([``False``] | ``True``)
             Normalize such that the final probability is one. In this case the function returns the
             (binned) cumulative probability density.
+
+        **workers** (``<int>``)
+            Compute the histogram in chunks on this number of threads, see :py:func:`histogram`.
     """
 
     return_edges = kwargs.pop("return_edges", True)
 
     norm = kwargs.pop("normalize", False)
 
-    P, edges = np.histogram(data, **kwargs)
+    P, edges = _histogram(data, **kwargs)
 
     P = np.cumsum(P)
 
@@ -2291,11 +4188,307 @@ def histogram_cumulative(data, **kwargs):
     return P, edges
 
 
+def histogram_rows(
+    data: ArrayLike,
+    bins: ArrayLike | int = 10,
+    weights: ArrayLike = None,
+    density: bool = False,
+    return_edges: bool = True,
+) -> (np.ndarray, np.ndarray):
+    """
+    Compute the histogram of each row, using the same bin-edges for all rows.
+    The result is identical to calling `numpy.histogram
+    <https://numpy.org/doc/stable/reference/generated/numpy.histogram.html>`__ for each row,
+    but all rows are binned at once.
+    Example: histogram of ``n`` realisations (each row is a realisation)::
+
+        bin_edges = gplt.histogram_bin_edges(data, bins=50)
+        P, x = gplt.histogram_rows(data, bins=bin_edges, density=True)  # P.shape == (n, 50)
+
+    :param data: Data [..., n_samples]: each histogram is computed along the last axis.
+    :param bins: The bin-edges, or the number of bins (equal bins spanning all data).
+    :param weights: Weight of each data-point (same shape as ``data``).
+    :param density: Normalise each row to unit integral (see :py:func:`histogram_norm`).
+    :param return_edges: Return the bin edges if ``True``, return their midpoints otherwise.
+    :return: ``(P, bin_edges)``, with ``P`` of shape [..., n_bins].
+    """
+
+    data = np.asarray(data)
+
+    if isinstance(bins, int):
+        bin_edges = np.histogram_bin_edges(data, bins=bins)
+    else:
+        bin_edges = np.asarray(bins)
+
+    nbins = bin_edges.size - 1
+    shape = data.shape[:-1]
+    data = data.reshape(-1, data.shape[-1])
+    nrows = data.shape[0]
+
+    # sorting is not needed for the result, but it makes the search of the bin much faster
+    if weights is None:
+        data = np.sort(data, axis=-1)
+    else:
+        weights = np.asarray(weights).ravel()
+
+    # bin index (all but the last bin are half-open, as numpy.histogram):
+    # "0" and "nbins + 1" are data below and above the bin-edges (or NaN)
+    index = np.searchsorted(bin_edges, data, side="right")
+    index[data == bin_edges[-1]] = nbins
+
+    # count per (row, bin) using a linear index
+    index += (nbins + 2) * np.arange(nrows).reshape(-1, 1)
+    P = np.bincount(index.ravel(), weights=weights, minlength=nrows * (nbins + 2))
+    P = P.reshape(nrows, nbins + 2)[:, 1:-1]
+    P = P.reshape(shape + (nbins,))
+
+    if density:
+        P = P / np.sum(P * np.diff(bin_edges), axis=-1, keepdims=True)
+
+    if return_edges:
+        return P, bin_edges
+
+    return P, histogram_bin_edges2midpoint(bin_edges)
+
+
+def _fixed_bin_edges(
+    bin_edges: ArrayLike | int, lim: tuple[float, float] = None, mode: str = "equal"
+) -> np.ndarray:
+    """
+    Bin-edges of :py:class:`Histogram` and :py:class:`BinAccumulator`.
+
+    :param bin_edges: The bin-edges, or the number of bins (requires ``lim``).
+    :param lim: Lower- and upper-bound of the bin-edges (only if ``bin_edges`` is an integer).
+    :param mode: Spacing of the bin-edges (``'equal'`` or ``'log'``, only if ``bin_edges`` is int).
+    :return: The bin-edges (a copy).
+    """
+    if isinstance(bin_edges, int):
+        if lim is None:
+            raise OSError('Specify "lim" to set the bin-edges')
+        if mode == "equal":
+            return np.linspace(lim[0], lim[1], bin_edges + 1)
+        if mode == "log":
+            return np.logspace(np.log10(lim[0]), np.log10(lim[1]), bin_edges + 1)
+        raise OSError("Unknown option")
+
+    return np.array(bin_edges)
+
+
+class Histogram:
+    """
+    Histogram with fixed bin-edges that is accumulated chunk-by-chunk.
+    Only the count per bin is stored, such that data that does not fit in memory
+    (e.g. spread over many files) can be histogrammed.
+    Histograms computed on different processes can be combined using :py:func:`Histogram.merge`.
+    Example::
+
+        hist = gplt.Histogram(50, lim=(1e-3, 1e3), mode="log")
+
+        for filename in filenames:
+            with h5py.File(filename) as file:
+                hist.add(file["data"][...])
+
+        gplt.hist(*hist.histogram(density=True))
+
+    As with `numpy.histogram
+    <https://numpy.org/doc/stable/reference/generated/numpy.histogram.html>`__,
+    all but the last bin are half-open, and data outside the bin-edges is ignored.
+
+    :param bin_edges: The bin-edges, or the number of bins (requires ``lim``).
+    :param lim: Lower- and upper-bound of the bin-edges (only if ``bin_edges`` is an integer).
+    :param mode:
+        Spacing of the bin-edges (only if ``bin_edges`` is an integer):
+        * ``'equal'``: each bin has equal width.
+        * ``'log'``: logarithmic spacing.
+    """
+
+    def __init__(
+        self,
+        bin_edges: ArrayLike | int,
+        lim: tuple[float, float] = None,
+        mode: str = "equal",
+    ):
+        self.bin_edges = _fixed_bin_edges(bin_edges, lim, mode)
+        self.count = np.zeros(self.bin_edges.size - 1, dtype=np.int64)
+        assert self.bin_edges.ndim == 1
+        assert self.count.size > 0
+
+    def add(self, data: ArrayLike):
+        """
+        Add data to the histogram.
+
+        :param data: Data (the histogram is computed over the flattened array).
+        """
+        self.count += np.histogram(data, bins=self.bin_edges)[0]
+
+    def merge(self, other: Histogram):
+        """
+        Add the counts of another histogram with the same bin-edges.
+
+        :param other: Histogram.
+        """
+        if not np.array_equal(self.bin_edges, other.bin_edges):
+            raise OSError("Bin-edges must be identical")
+
+        self.count += other.count
+
+    @property
+    def midpoints(self) -> np.ndarray:
+        """
+        Midpoint of each bin.
+        """
+        return histogram_bin_edges2midpoint(self.bin_edges)
+
+    @property
+    def density(self) -> np.ndarray:
+        """
+        Probability density of each bin (normalised such that the integral is one).
+        Zero if no data was added.
+        """
+        total = np.sum(self.count)
+
+        if total == 0:
+            return np.zeros(self.count.shape)
+
+        return self.count / np.diff(self.bin_edges) / total
+
+    def cumulative(self, normalize: bool = False) -> np.ndarray:
+        """
+        Cumulative count, see :py:func:`histogram_cumulative`.
+
+        :param normalize: Normalize such that the final probability is one (zero if no data).
+        :return: Cumulative count (or probability) at the upper edge of each bin.
+        """
+        P = np.cumsum(self.count)
+
+        if normalize:
+            if P.size == 0 or P[-1] == 0:
+                return np.zeros(P.shape)
+            return P / P[-1]
+
+        return P
+
+    def histogram(self, density: bool = False, return_edges: bool = True):
+        """
+        Histogram in the format of :py:func:`histogram`, which can be plotted with :py:func:`hist`.
+
+        :param density: Return the probability density instead of the count.
+        :param return_edges: Return the bin edges if ``True``, return their midpoints otherwise.
+        :return: ``(P, bin_edges)`` or ``(P, midpoints)``.
+        """
+        P = self.density if density else self.count.copy()
+
+        if return_edges:
+            return P, self.bin_edges.copy()
+
+        return P, self.midpoints
+
+
+class LogHistogram(Histogram):
+    """
+    Histogram with logarithmically spaced bins whose range grows as data is added.
+    Contrary to :py:func:`histogram_bin_edges` (``mode="log"``) the minimum and maximum of the data
+    need not be known in advance, such that the data has to be read only once.
+    The bin-edges are :math:`10^{i / n}`, with :math:`n` the number of bins per decade,
+    and :math:`i` an integer.
+    Because all histograms share these edges, histograms with different ranges
+    (e.g. computed on different processes) can be combined exactly using
+    :py:func:`LogHistogram.merge`.
+    Example::
+
+        hist = gplt.LogHistogram(bins_per_decade=10)
+
+        for filename in filenames:
+            with h5py.File(filename) as file:
+                hist.add(file["data"][...])
+
+        gplt.hist(*hist.histogram(density=True))
+
+    Data that is not strictly positive and finite is ignored.
+    Until data is added, the histogram has no bins:
+    ``count`` and ``bin_edges`` are empty (and so are the density and the cumulative count).
+
+    :param bins_per_decade: Number of bins per decade.
+    """
+
+    def __init__(self, bins_per_decade: int = 10):
+        assert bins_per_decade > 0
+        self.bins_per_decade = int(bins_per_decade)
+        self.start = 0
+        self.count = np.zeros(0, dtype=np.int64)
+
+    def _edges(self, index: ArrayLike) -> np.ndarray:
+        return 10.0 ** (np.asarray(index) / self.bins_per_decade)
+
+    def _extend(self, lower: int, upper: int):
+        """
+        Extend the range such that it includes bins ``lower`` to ``upper`` (inclusive).
+        """
+        if self.count.size == 0:
+            self.start = lower
+            self.count = np.zeros(upper - lower + 1, dtype=np.int64)
+            return
+
+        stop = self.start + self.count.size
+        start = min(self.start, lower)
+        count = np.zeros(max(stop, upper + 1) - start, dtype=np.int64)
+        count[self.start - start : stop - start] = self.count  # noqa: E203
+        self.start = start
+        self.count = count
+
+    @property
+    def bin_edges(self) -> np.ndarray:
+        """
+        The bin-edges (empty if no data was added).
+        """
+        if self.count.size == 0:
+            return np.zeros(0)
+
+        return self._edges(np.arange(self.start, self.start + self.count.size + 1))
+
+    def add(self, data: ArrayLike):
+        """
+        Add data to the histogram.
+
+        :param data: Data (the histogram is computed over the flattened array).
+        """
+        data = np.asarray(data, dtype=float).ravel()
+        data = data[np.logical_and(data > 0, np.isfinite(data))]
+
+        if data.size == 0:
+            return
+
+        # bin index, corrected for round-off such that it is consistent with the bin-edges
+        index = np.floor(self.bins_per_decade * np.log10(data)).astype(np.int64)
+        index -= data < self._edges(index)
+        index += data >= self._edges(index + 1)
+
+        self._extend(np.min(index), np.max(index))
+        self.count += np.bincount(index - self.start, minlength=self.count.size)
+
+    def merge(self, other: LogHistogram):
+        """
+        Add the counts of another histogram with the same number of bins per decade.
+
+        :param other: Histogram.
+        """
+        if self.bins_per_decade != other.bins_per_decade:
+            raise OSError("Number of bins per decade must be identical")
+
+        if other.count.size == 0:
+            return
+
+        self._extend(other.start, other.start + other.count.size - 1)
+        i = other.start - self.start
+        self.count[i : i + other.count.size] += other.count  # noqa: E203
+
+
 def hist(P, edges, **kwargs):
     r"""
     Plot histogram.
     """
 
+    import matplotlib.pyplot as plt
     from matplotlib.collections import PatchCollection
     from matplotlib.patches import Polygon
 
@@ -2345,43 +4538,187 @@ def hist(P, edges, **kwargs):
     return p
 
 
-def cdf(data: ArrayLike, less_equal: bool = False) -> (np.ndarray, np.ndarray):
+def cdf(
+    data: ArrayLike, less_equal: bool = False, workers: int = None, dtype=None
+) -> (np.ndarray, np.ndarray):
     """
     Cumulative distribution function: ``P(x < X)``.
 
     :param data: Input data.
     :param less_equal: If ``True`` return ``P(x <= X)``, if ``False return ``P(x < X)``.
+    :param workers: Count in chunks on this number of threads (the result is identical).
+    :param dtype: Data-type of the probabilities (default: ``float64``).
     :return: ``(P, X)``
     """
 
-    bin_edges = np.unique(data)
-    ibin = np.digitize(data, bin_edges, right=not less_equal)
-    _, count = np.unique(ibin, return_counts=True)
+    bin_edges, index = _unique_index(data, workers)
 
     if less_equal:
-        return np.cumsum(count) / data.size, bin_edges
+        return np.divide(index[1:], index[-1], dtype=dtype), bin_edges
     else:
-        return np.cumsum([0] + count.tolist())[:-1] / data.size, bin_edges
+        return np.divide(index[:-1], index[-1], dtype=dtype), bin_edges
 
 
-def ccdf(data: ArrayLike, greater_equal: bool = True) -> (np.ndarray, np.ndarray):
+def ccdf(
+    data: ArrayLike, greater_equal: bool = True, workers: int = None, dtype=None
+) -> (np.ndarray, np.ndarray):
     """
     Complementary cumulative distribution function: ``P(x >= X)``.
     By definition: ``ccdf(data)[0] == 1 - cdf(data)[0])``.
 
     :param data: Input data.
     :param greater_equal: If ``True`` return ``P(x >= X)``, if ``False return ``P(x > X)``.
+    :param workers: Count in chunks on this number of threads (the result is identical).
+    :param dtype: Data-type of the probabilities (default: ``float64``).
     :return: ``(P, X)``
     """
 
-    bin_edges = np.unique(data)
-    ibin = np.digitize(data, bin_edges[::-1], right=greater_equal)
-    _, count = np.unique(ibin, return_counts=True)
+    bin_edges, index = _unique_index(data, workers)
+    n = index[-1]
+    index = np.subtract(n, index, out=index)
 
     if greater_equal:
-        return np.cumsum(count)[::-1] / data.size, bin_edges
+        return np.divide(index[:-1], n, dtype=dtype), bin_edges
     else:
-        return np.cumsum([0] + count.tolist())[1::-1] / data.size, bin_edges
+        return np.divide(index[1:], n, dtype=dtype), bin_edges
+
+
+def _decimate_cell(data: np.ndarray, delta: float, log: bool) -> np.ndarray:
+    """
+    Index of the cell of size ``delta`` (in decades if ``log``) in which each point lies.
+    """
+    if log:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.floor(np.log10(data) / delta)
+    return np.floor(data / delta)
+
+
+def cdf_decimate(
+    P: ArrayLike,
+    X: ArrayLike,
+    dp: float = 1e-3,
+    dx: float = None,
+    logp: bool = False,
+    logx: bool = False,
+    tail: int = 100,
+) -> (np.ndarray, np.ndarray):
+    """
+    Reduce a (complementary) cumulative distribution, from :py:func:`cdf` or :py:func:`ccdf`,
+    to the points needed to plot it at a given resolution.
+    The curve is divided in cells of size ``dp`` along ``P`` (and ``dx`` along ``X``),
+    of each cell only the first and the last point are kept.
+    A line through the kept points therefore deviates less than ``dp`` in ``P``
+    from a line through all points.
+    Example::
+
+        P, X = gplt.ccdf(data)
+        P, X = gplt.cdf_decimate(P, X, dp=1e-3, dx=1e-3, logp=True, logx=True)
+        ax.plot(X, P)
+
+    :param P: Probabilities (monotonic).
+    :param X: Values (monotonic).
+    :param dp: Maximal error in ``P`` (in decades if ``logp``).
+    :param dx: Resolution along ``X`` (in decades if ``logx``), by default ``X`` is not used.
+    :param logp: Use logarithmic cells along ``P``, e.g. for a logarithmic axis.
+    :param logx: Use logarithmic cells along ``X``, e.g. for a logarithmic axis.
+    :param tail:
+        Number of points at either end that are always kept
+        (the first and the last point are always kept, also if ``tail = 0``).
+    :return: ``(P, X)``
+    """
+
+    P = np.asarray(P)
+    X = np.asarray(X)
+    assert P.ndim == 1
+    assert P.shape == X.shape
+
+    n = max(tail, 1)
+
+    if P.size <= 2 * n:
+        return P, X
+
+    cell = _decimate_cell(P, dp, logp)
+    change = cell[1:] != cell[:-1]
+
+    if dx is not None:
+        cell = _decimate_cell(X, dx, logx)
+        change |= cell[1:] != cell[:-1]
+
+    keep = np.zeros(P.size, dtype=bool)
+    keep[1:] = change
+    keep[:-1] |= change
+    keep[:n] = True
+    keep[-n:] = True
+
+    return P[keep], X[keep]
+
+
+def _bin_index(x: np.ndarray, bin_edges: np.ndarray) -> np.ndarray:
+    """
+    Index of the bin in which each point lies.
+    As for ``numpy.histogram``, all but the last bin are half-open.
+    Points outside the bin-edges get index ``-1``.
+
+    :param x: Data.
+    :param bin_edges: Bin-edges (monotonically increasing).
+    :return: Bin-index per point.
+    """
+    n = bin_edges.size - 1
+    index = np.searchsorted(bin_edges, x, side="right") - 1
+    index[x == bin_edges[-1]] = n - 1
+    index[index >= n] = -1
+    return index
+
+
+def _binned_mean_std(index: np.ndarray, count: np.ndarray, data: np.ndarray):
+    """
+    Mean and (population) standard deviation per bin (``NaN`` for empty bins).
+
+    :param index: Bin-index per point (all points must lie in a bin).
+    :param count: Number of points per bin.
+    :param data: Data per point.
+    :return: ``(mean, std)``
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(index, weights=data, minlength=count.size) / count
+        var = np.bincount(index, weights=(data - mean[index]) ** 2, minlength=count.size) / count
+    return mean, np.sqrt(var)
+
+
+def _binned_quantile(
+    index: np.ndarray, count: np.ndarray, data: np.ndarray, q: ArrayLike
+) -> np.ndarray:
+    """
+    Quantiles per bin (``NaN`` for empty bins), with linear interpolation as ``numpy.quantile``.
+    The data is sorted per bin by sorting it once on value, followed by a stable sort on bin.
+
+    :param index: Bin-index per point (all points must lie in a bin).
+    :param count: Number of points per bin.
+    :param data: Data per point.
+    :param q: Quantile(s).
+    :return: Quantiles, shape ``[len(q), len(count)]`` (or ``[len(count)]`` for scalar ``q``).
+    """
+    q = np.asarray(q, dtype=float)
+    ret = np.full(q.shape + count.shape, np.nan)
+
+    if data.size == 0:
+        return ret
+
+    order = np.argsort(data)
+    segment = index[order].astype(np.min_scalar_type(count.size))
+    data = data[order[np.argsort(segment, kind="stable")]]
+
+    start = np.cumsum(count) - count
+    pos = q[..., np.newaxis] * (count - 1)
+    lower = np.floor(pos)
+    frac = pos - lower
+    lower = np.clip(start + lower.astype(np.int64), 0, data.size - 1)
+    upper = np.clip(lower + (frac > 0), 0, data.size - 1)
+    a = data[lower]
+    b = data[upper]
+    ret = a + (b - a) * frac
+    ret[..., count == 0] = np.nan
+    return ret
 
 
 def bin(
@@ -2390,62 +4727,334 @@ def bin(
     bin_edges: ArrayLike | int,
     use_median: bool = False,
     return_n: bool = False,
+    quantiles: ArrayLike = None,
 ):
     """
     Bin data.
+    As for ``numpy.histogram``, all but the last bin are half-open,
+    and data outside the bin-edges is ignored.
+    Example: percentile bands::
+
+        data = gplt.bin(x, y, bin_edges, quantiles=[0.05, 0.25, 0.75, 0.95])
+        gplt.plot_bands(data["x"], data["yq"])
+        ax.plot(data["x"], data["y"])
 
     :param x: x-data.
-    :param y: y-data.
-    :param bin_edges: Bin-edges along the x-axis, or the number of bins.
+    :param y:
+        y-data. Several observables can be binned at once (grouping the data only once):
+        * array of the same shape as ``x``: one observable.
+        * 2-d array ``[len(x), k]`` (with ``x`` 1-d): ``k`` observables (columns),
+          entries "y", "yerr", and "yq" then get a trailing dimension ``k``.
+        * dictionary of 1-d arrays: entries "y", "yerr", and "yq" are then dictionaries.
+    :param bin_edges: Bin-edges along the x-axis, or the number of bins (of equal width).
     :param use_median: Use median instead of mean.
     :param return_n: Return the number of points in each bin (as dictionary entry "n").
+    :param quantiles: Quantiles of y to compute for each bin (as dictionary entry "yq").
     :return: Dictionary as follows::
         x: mean(x) for each bin (or median(x) if use_median = True).
         y: mean(y) for each bin (or median(y) if use_median = True).
         xerr: std(x) for each bin.
         yerr: std(y) for each bin.
+        yq: quantiles of y for each bin [len(quantiles), nbins] (if quantiles is specified).
     """
 
-    x = np.array(x)
-    y = np.array(y)
+    x = np.asarray(x)
+    stacked = False
 
-    j = np.digitize(x, bin_edges) - 1
-    n = bin_edges.size - 1
+    if isinstance(y, dict):
+        columns = {key: np.asarray(value).ravel() for key, value in y.items()}
+    else:
+        y = np.asarray(y)
+        stacked = x.ndim == 1 and y.ndim == 2 and y.shape[0] == x.size
+        columns = dict(enumerate(y.T)) if stacked else {None: y.ravel()}
+
+    x = x.ravel()
+
+    for value in columns.values():
+        assert x.shape == value.shape
+
+    if isinstance(bin_edges, int):
+        bin_edges = histogram_bin_edges(x, bins=bin_edges, remove_empty_edges=False)
+
+    bin_edges = np.asarray(bin_edges)
+    index = _bin_index(x, bin_edges)
+    keep = index >= 0
+    index = index[keep]
+    n = np.bincount(index, minlength=bin_edges.size - 1)
+    x = x[keep]
+    xmean, xerr = _binned_mean_std(index, n, x)
+
+    if use_median:
+        xmean = _binned_quantile(index, n, x, 0.5)
+
+    ret = {"x": xmean, "y": {}, "xerr": xerr, "yerr": {}, "n": n}
+
+    if quantiles is not None:
+        ret["yq"] = {}
+
+    for key, value in columns.items():
+        value = value[keep]
+        ret["y"][key], ret["yerr"][key] = _binned_mean_std(index, n, value)
+        if use_median:
+            ret["y"][key] = _binned_quantile(index, n, value, 0.5)
+        if quantiles is not None:
+            ret["yq"][key] = _binned_quantile(index, n, value, quantiles)
+
+    if not isinstance(y, dict):
+        for name in ["y", "yerr", "yq"]:
+            if name not in ret:
+                continue
+            if stacked:
+                ret[name] = np.stack(list(ret[name].values()), axis=-1)
+            else:
+                ret[name] = ret[name][None]
+
+    if return_n:
+        return ret
+
+    ret.pop("n")
+    return ret
+
+
+def bin2d(
+    x: ArrayLike,
+    y: ArrayLike,
+    z: ArrayLike,
+    bins: int | ArrayLike | tuple = 10,
+    mode: str | tuple[str, str] = "equal",
+    use_median: bool = False,
+    quantiles: ArrayLike = None,
+) -> dict:
+    """
+    Bin data on a two-dimensional grid: statistics of ``z`` in bins of ``x`` and ``y``.
+    As for ``numpy.histogram2d``, all but the last bin along each axis are half-open,
+    and data outside the bin-edges is ignored.
+    Example::
+
+        data = gplt.bin2d(x, y, z, bins=(50, 20), mode=("equal", "log"))
+        ax.pcolormesh(data["xedges"], data["yedges"], data["z"])
+
+    or, for bins of equal width::
+
+        ax.imshow(data["z"], origin="lower", extent=data["extent"], aspect="auto")
+
+    :param x: x-data.
+    :param y: y-data.
+    :param z: z-data (the binned observable).
+    :param bins:
+        The number of bins or the bin-edges along both axes, or a pair ``(x, y)`` of those.
+    :param mode:
+        Mode with which to compute the bin-edges (if ``bins`` is a number),
+        see :py:func:`histogram_bin_edges`, or a pair ``(x, y)`` of modes.
+    :param use_median: Use median instead of mean.
+    :param quantiles: Quantiles of z to compute for each bin (as dictionary entry "zq").
+    :return: Dictionary as follows (each statistic has shape ``[ny, nx]``)::
+        xedges: bin-edges along the x-axis [nx + 1].
+        yedges: bin-edges along the y-axis [ny + 1].
+        extent: (xedges[0], xedges[-1], yedges[0], yedges[-1]).
+        z: mean(z) for each bin (or median(z) if use_median = True).
+        zerr: std(z) for each bin.
+        n: number of points in each bin.
+        zq: quantiles of z for each bin [len(quantiles), ny, nx] (if quantiles is specified).
+    """
+
+    x = np.asarray(x).ravel()
+    y = np.asarray(y).ravel()
+    z = np.asarray(z).ravel()
+    assert x.shape == y.shape
+    assert x.shape == z.shape
+
+    if isinstance(bins, tuple):
+        assert len(bins) == 2
+    else:
+        bins = (bins, bins)
+
+    if isinstance(mode, str):
+        mode = (mode, mode)
+
+    edges = []
+
+    for data, b, m in zip([x, y], bins, mode):
+        if isinstance(b, int):
+            b = histogram_bin_edges(data, bins=b, mode=m)
+        edges.append(np.asarray(b))
+
+    nx = edges[0].size - 1
+    ny = edges[1].size - 1
+    ix = _bin_index(x, edges[0])
+    iy = _bin_index(y, edges[1])
+    keep = np.logical_and(ix >= 0, iy >= 0)
+    index = iy[keep] * nx + ix[keep]
+    z = z[keep]
+    n = np.bincount(index, minlength=nx * ny)
+    zmean, zerr = _binned_mean_std(index, n, z)
+
+    if use_median:
+        zmean = _binned_quantile(index, n, z, 0.5)
 
     ret = {
-        "x": np.nan * np.ones(n, dtype=float),
-        "y": np.nan * np.ones(n, dtype=float),
-        "xerr": np.nan * np.ones(n, dtype=float),
-        "yerr": np.nan * np.ones(n, dtype=float),
-        "n": np.zeros(n, dtype=int),
+        "xedges": edges[0],
+        "yedges": edges[1],
+        "extent": (edges[0][0], edges[0][-1], edges[1][0], edges[1][-1]),
+        "z": zmean.reshape(ny, nx),
+        "zerr": zerr.reshape(ny, nx),
+        "n": n.reshape(ny, nx),
     }
 
-    assert np.max(j) < ret["x"].size
+    if quantiles is not None:
+        zq = _binned_quantile(index, n, z, quantiles)
+        ret["zq"] = zq.reshape(zq.shape[:-1] + (ny, nx))
 
-    for i in range(np.max(j) + 1):
-        if i not in j:
-            continue
+    return ret
 
-        sel = j == i
-        ret["n"][i] = np.sum(sel)
 
-        if not use_median:
-            ret["x"][i] = np.mean(x[sel])
-            ret["y"][i] = np.mean(y[sel])
-        else:
-            ret["x"][i] = np.median(x[sel])
-            ret["y"][i] = np.median(y[sel])
+def plot_bands(x: ArrayLike, yq: ArrayLike, **kwargs) -> list:
+    """
+    Plot bands between pairs of quantiles, e.g. from :py:func:`bin` (entry "yq"),
+    using ``fill_between``.
+    The outermost quantiles form the first band, the next pair the second band, and so on,
+    for example ``[0.05, 0.25, 0.75, 0.95]`` gives a 5-95% band and a 25-75% band.
+    As all bands are drawn semi-transparent (on top of each other), inner bands appear darker.
 
-        ret["xerr"][i] = np.std(x[sel])
-        ret["yerr"][i] = np.std(y[sel])
+    :param x: x-data.
+    :param yq: Quantiles [nquantiles, len(x)] (in ascending order).
+    :param axis: Axis to plot in (default: current axis).
+    :param kwargs: Options passed to ``fill_between``.
+    :return: List of handles (one per band).
+    """
 
-    if return_n:
-        return ret
+    import matplotlib.pyplot as plt
+
+    axis = kwargs.pop("axis", None)
+    axis = axis if axis else plt.gca()
+
+    yq = np.asarray(yq)
+    assert yq.ndim == 2
+    kwargs.setdefault("alpha", 0.3)
+    kwargs.setdefault("linewidth", 0)
+    ret = []
+
+    for i in range(yq.shape[0] // 2):
+        ret.append(axis.fill_between(x, yq[i], yq[-1 - i], **kwargs))
+        if "color" not in kwargs and "facecolor" not in kwargs:
+            kwargs["color"] = ret[-1].get_facecolor()[0][:3]
 
-    ret.pop("n")
     return ret
 
 
+class BinAccumulator:
+    """
+    Binned mean and standard deviation of data that is added chunk-by-chunk,
+    in the format of :py:func:`bin`.
+    Per bin, only the number of points, the mean, and the sum of squared deviations from the mean
+    are stored (Welford's algorithm, combined chunk-wise as in
+    `Chan et al. 1979 <https://doi.org/10.1007/978-3-642-51461-6_3>`__),
+    such that the memory does not depend on the amount of data.
+    Accumulators computed on different processes can be combined using
+    :py:func:`BinAccumulator.merge`.
+    Example::
+
+        binned = gplt.BinAccumulator(np.linspace(0, 1, 51))
+
+        for filename in filenames:
+            with h5py.File(filename) as file:
+                binned.add(file["x"][...], file["y"][...])
+
+        data = binned.bin()
+        ax.errorbar(data["x"], data["y"], yerr=data["yerr"])
+
+    :param bin_edges: Bin-edges along the x-axis, or the number of bins (requires ``lim``).
+    :param lim: Lower- and upper-bound of the bin-edges (only if ``bin_edges`` is an integer).
+    :param mode:
+        Spacing of the bin-edges (only if ``bin_edges`` is an integer):
+        * ``'equal'``: each bin has equal width.
+        * ``'log'``: logarithmic spacing.
+    """
+
+    def __init__(
+        self,
+        bin_edges: ArrayLike | int,
+        lim: tuple[float, float] = None,
+        mode: str = "equal",
+    ):
+        self.bin_edges = _fixed_bin_edges(bin_edges, lim, mode)
+        assert self.bin_edges.ndim == 1
+        assert self.bin_edges.size > 1
+        n = self.bin_edges.size - 1
+        self.count = np.zeros(n, dtype=np.int64)
+        self.mean = {"x": np.zeros(n, dtype=float), "y": np.zeros(n, dtype=float)}
+        self.m2 = {"x": np.zeros(n, dtype=float), "y": np.zeros(n, dtype=float)}
+
+    def _merge(self, count: np.ndarray, mean: dict, m2: dict):
+        n = self.count + count
+        frac = np.divide(count, n, out=np.zeros(n.size, dtype=float), where=n > 0)
+
+        for key in self.mean:
+            delta = mean[key] - self.mean[key]
+            self.mean[key] += delta * frac
+            self.m2[key] += m2[key] + delta**2 * self.count * frac
+
+        self.count = n
+
+    def add(self, x: ArrayLike, y: ArrayLike):
+        """
+        Add data.
+
+        :param x: x-data.
+        :param y: y-data.
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        assert x.shape == y.shape
+
+        index = _bin_index(x, self.bin_edges)
+        keep = index >= 0
+        index = index[keep]
+        count = np.bincount(index, minlength=self.count.size)
+        mean = {}
+        m2 = {}
+
+        for key, data in zip(["x", "y"], [x[keep], y[keep]]):
+            mean[key], std = _binned_mean_std(index, count, data)
+            m2[key] = np.where(count > 0, std**2 * count, 0)
+            mean[key] = np.where(count > 0, mean[key], 0)
+
+        self._merge(count, mean, m2)
+
+    def merge(self, other: BinAccumulator):
+        """
+        Add the data of another accumulator with the same bin-edges.
+
+        :param other: Accumulator.
+        """
+        if not np.array_equal(self.bin_edges, other.bin_edges):
+            raise OSError("Bin-edges must be identical")
+
+        self._merge(other.count, other.mean, other.m2)
+
+    def bin(self, return_n: bool = False) -> dict:
+        """
+        Binned data in the format of :py:func:`bin` (``NaN`` for empty bins).
+
+        :param return_n: Return the number of points in each bin (as dictionary entry "n").
+        :return: Dictionary with "x", "y", "xerr", "yerr" (and "n").
+        """
+        empty = self.count == 0
+        ret = {}
+
+        for key in ["x", "y"]:
+            ret[key] = np.where(empty, np.nan, self.mean[key])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for key in ["x", "y"]:
+                ret[key + "err"] = np.sqrt(self.m2[key] / self.count)
+
+        if return_n:
+            ret["n"] = self.count.copy()
+
+        return ret
+
+
 def patch(*args, **kwargs):
     """
     Add patches to plot. The color of the patches is indexed according to a specified color-index.
@@ -2475,12 +5084,7 @@ def patch(*args, **kwargs):
 
             plt.show()
 
-    :arguments - option 1/2:
-
-        **patches** (``<list>``)
-            List with patch objects. Can be replaced by specifying ``coor`` and ``conn``.
-
-    :arguments - option 2/2:
+    :arguments:
 
         **coor** (``<numpy.ndarray>`` | ``<list>`` (nested))
             Matrix with on each row the coordinates (positions) of each node.
@@ -2488,6 +5092,8 @@ def patch(*args, **kwargs):
         **conn** (``<numpy.ndarray>`` | ``<list>`` (nested))
             Matrix with on each row the number numbers (rows in ``coor``)
             which form an element (patch).
+            Elements with different numbers of nodes (e.g. triangles and quadrilaterals)
+            can be specified as a nested list.
 
     :options:
 
@@ -2522,21 +5128,25 @@ def patch(*args, **kwargs):
 
     .. seealso::
 
+        *   :py:class:`PatchHandle` to update the mesh in-place (e.g. for animations).
         *   `matplotlib example
             <http://matplotlib.org/examples/api/patch_collection.html>`_.
     """
 
-    from matplotlib.collections import PatchCollection
-    from matplotlib.patches import Polygon
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import PolyCollection
 
     # check dependent options
+    if len(args) > 0:
+        raise OSError('Positional arguments are not supported, specify "coor" and "conn"')
     if "coor" not in kwargs or "conn" not in kwargs:
         raise OSError('Specify both "coor" and "conn"')
 
     # extract local options
-    axis = kwargs.pop("axis", plt.gca())
+    axis = kwargs.pop("axis", None)
+    axis = axis if axis else plt.gca()
     cindex = kwargs.pop("cindex", None)
-    coor = kwargs.pop("coor", None)
+    coor = np.asarray(kwargs.pop("coor", None))
     conn = kwargs.pop("conn", None)
     autoscale = kwargs.pop("autoscale", True)
 
@@ -2547,15 +5157,12 @@ def patch(*args, **kwargs):
     if cindex is None:
         kwargs.setdefault("facecolor", (0.0, 0.0, 0.0, 0.0))
 
-    # convert mesh -> list of Polygons
-    if coor is not None and conn is not None:
-        poly = []
-        for iconn in conn:
-            poly.append(Polygon(coor[iconn, :]))
-        args = tuple(poly, *args)
-
-    # convert patches -> matplotlib-objects
-    p = PatchCollection(args, **kwargs)
+    # convert mesh -> matplotlib-objects: vertices of all elements as one array [nelem, nne, 2]
+    # (elements with different numbers of nodes: a list with the vertices of each element)
+    if isinstance(conn, np.ndarray) or len({len(iconn) for iconn in conn}) <= 1:
+        p = PolyCollection(coor[np.asarray(conn, dtype=int), :2], **kwargs)
+    else:
+        p = PolyCollection([coor[np.asarray(iconn, dtype=int), :2] for iconn in conn], **kwargs)
     # add colors to patches
     if cindex is not None:
         p.set_array(cindex)
@@ -2574,9 +5181,96 @@ def patch(*args, **kwargs):
     return p
 
 
-@deprecation.deprecated(
-    deprecated_in="0.6.0", current_version=version, details="Use openscienceplot_matplotlib"
-)
+class PatchHandle:
+    """
+    Mesh plotted by :py:func:`patch` that can be updated in-place, e.g. to animate a time series.
+    The vertices of all elements are stored in one array that is shared with the paths of the
+    collection, such that a new frame only overwrites that array (and the color-index).
+    Example::
+
+        fig, ax = plt.subplots()
+        mesh = gplt.PatchHandle(coor=coor + disp[0], conn=conn, cindex=stress[0], clim=(0, 1))
+
+        # with matplotlib.animation.FuncAnimation (optionally with blit=True)
+        def frame(t):
+            return mesh.update(coor=coor + disp[t], cindex=stress[t])
+
+        # or: stream all frames to a movie
+        mesh.save("movie.mp4", ({"coor": coor + u, "cindex": s} for u, s in zip(disp, stress)))
+
+    :param coor: Nodal coordinates [nnode, ndim].
+    :param conn: Connectivity [nelem, nne].
+    :param kwargs: Options passed to :py:func:`patch` (e.g. ``cindex``, ``axis``, ``cmap``).
+    """
+
+    def __init__(self, coor: ArrayLike, conn: ArrayLike, **kwargs):
+        from matplotlib.path import Path
+
+        self.conn = np.asarray(conn)
+        self.collection = patch(coor=coor, conn=self.conn, **kwargs)
+
+        # vertices of closed polygons [nelem, nne + 1, 2]; the paths are views of this array
+        self._verts = np.empty((self.conn.shape[0], self.conn.shape[1] + 1, 2))
+        self._set_verts(coor)
+        self.collection.set_verts(self._verts, closed=False)
+        codes = Path(self._verts[0], closed=True).codes
+        for path in self.collection.get_paths():
+            path.codes = codes
+
+    def _set_verts(self, coor: ArrayLike):
+        coor = np.asarray(coor, dtype=float)
+        np.take(coor[:, :2], self.conn, axis=0, out=self._verts[:, :-1])
+        self._verts[:, -1] = self._verts[:, 0]
+
+    def update(self, coor: ArrayLike = None, cindex: ArrayLike = None) -> list:
+        """
+        Update the nodal coordinates and/or the color-index.
+
+        :param coor: Nodal coordinates [nnode, ndim] (same number of nodes as before).
+        :param cindex: Color-index per element.
+        :return: List of modified artists (as required by ``FuncAnimation(..., blit=True)``).
+        """
+        if coor is not None:
+            self._set_verts(coor)
+            self.collection.stale = True
+
+        if cindex is not None:
+            self.collection.set_array(cindex)
+
+        return [self.collection]
+
+    def save(
+        self, filename: str, frames, writer=None, fps: float = 25, dpi: float = None, **kwargs
+    ):
+        """
+        Stream frames to a movie: each frame is drawn and written directly,
+        such that frames are never stored in memory.
+
+        :param filename: Output filename.
+        :param frames: Iterable of frames, each a dictionary with arguments of :py:func:`update`.
+        :param writer:
+            A ``matplotlib.animation.MovieWriter``,
+            or the name of a registered writer (default: ``rcParams["animation.writer"]``).
+        :param fps: Frames per second (only if ``writer`` is not an instance).
+        :param dpi: Resolution of the movie (default: that of the figure).
+        :param kwargs: Options passed to the writer (only if ``writer`` is not an instance).
+        """
+        import matplotlib as mpl
+        from matplotlib import animation
+
+        if writer is None:
+            writer = mpl.rcParams["animation.writer"]
+
+        if isinstance(writer, str):
+            writer = animation.writers[writer](fps=fps, **kwargs)
+
+        with writer.saving(self.collection.axes.figure, filename, dpi):
+            for frame in frames:
+                self.update(**frame)
+                writer.grab_frame()
+
+
+@_deprecated(deprecated_in="0.6.0", details="Use openscienceplot_matplotlib")
 def write_data(data, key, handle):
     r"""
     Save plot data to HDF5-file.
@@ -2595,6 +5289,9 @@ def write_data(data, key, handle):
 
     import warnings
 
+    import matplotlib.container
+    import matplotlib.lines
+
     if key == "/":
         raise OSError("Cannot write to root")
 
@@ -2625,9 +5322,7 @@ def write_data(data, key, handle):
     raise OSError("Unknown handle. Please consider filing a bug-report.")
 
 
-@deprecation.deprecated(
-    deprecated_in="0.6.0", current_version=version, details="Use openscienceplot_matplotlib"
-)
+@_deprecated(deprecated_in="0.6.0", details="Use openscienceplot_matplotlib")
 def restore_data(data, key, axis=None):
     r"""
     Restore plot from HDF5-file.
@@ -2651,6 +5346,8 @@ def restore_data(data, key, axis=None):
             The handle of the created plot.
     """
 
+    import matplotlib.pyplot as plt
+
     if axis is None:
         plt.gca()
 
@@ -0,0 +1,66 @@
+"""
+:py:func:`GooseMPL.bin` versus the original implementation (one mask per bin).
+"""
+import argparse
+import time
+
+import numpy as np
+
+import GooseMPL as gplt
+
+
+def bin_reference(x, y, bin_edges, use_median=False):
+    """
+    Original implementation of :py:func:`GooseMPL.bin`.
+    """
+    j = np.digitize(x, bin_edges) - 1
+    n = bin_edges.size - 1
+
+    ret = {
+        "x": np.nan * np.ones(n, dtype=float),
+        "y": np.nan * np.ones(n, dtype=float),
+        "xerr": np.nan * np.ones(n, dtype=float),
+        "yerr": np.nan * np.ones(n, dtype=float),
+    }
+
+    for i in range(np.max(j) + 1):
+        if i not in j:
+            continue
+
+        sel = j == i
+
+        if not use_median:
+            ret["x"][i] = np.mean(x[sel])
+            ret["y"][i] = np.mean(y[sel])
+        else:
+            ret["x"][i] = np.median(x[sel])
+            ret["y"][i] = np.median(y[sel])
+
+        ret["xerr"][i] = np.std(x[sel])
+        ret["yerr"][i] = np.std(y[sel])
+
+    return ret
+
+
+def timeit(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    ret = func(*args, **kwargs)
+    return time.perf_counter() - t0, ret
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--size", type=int, default=1_000_000, help="Number of samples")
+parser.add_argument("--bins", type=int, default=1000, help="Number of bins")
+args = parser.parse_args()
+
+rng = np.random.default_rng(0)
+x = rng.random(args.size)
+y = rng.normal(size=args.size)
+bin_edges = np.linspace(0, 1, args.bins + 1)
+bin_edges[-1] = 1.1  # the original does not support data on the last bin-edge
+
+for use_median in [False, True]:
+    t_new, a = timeit(gplt.bin, x, y, bin_edges, use_median=use_median)
+    t_ref, b = timeit(bin_reference, x, y, bin_edges, use_median=use_median)
+    assert all(np.allclose(a[key], b[key], equal_nan=True) for key in b)
+    print(f"bin(use_median={use_median}): {t_new:.4f}s (original: {t_ref:.4f}s)")
@@ -0,0 +1,52 @@
+"""
+:py:func:`GooseMPL.ccdf` versus the original implementation
+(``numpy.unique``, ``numpy.digitize``, ``numpy.unique`` on the bin-index):
+run-time and peak memory.
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import GooseMPL as gplt
+
+
+def ccdf_reference(data):
+    """
+    Original implementation of :py:func:`GooseMPL.ccdf` (``greater_equal=True``).
+    """
+    bin_edges = np.unique(data)
+    ibin = np.digitize(data, bin_edges[::-1], right=True)
+    _, count = np.unique(ibin, return_counts=True)
+    return np.cumsum(count)[::-1] / data.size, bin_edges
+
+
+def measure(func, *args, **kwargs):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    ret = func(*args, **kwargs)
+    t = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return t, peak, ret
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--size", type=int, default=10_000_000, help="Number of samples")
+args = parser.parse_args()
+
+rng = np.random.default_rng(0)
+
+for name, data in [
+    ("continuous", rng.pareto(1.5, size=args.size)),
+    ("discrete", rng.integers(0, 1000, size=args.size) / 10),
+]:
+    t_ref, m_ref, (a, x) = measure(ccdf_reference, data)
+    t_new, m_new, (b, y) = measure(gplt.ccdf, data)
+    t_f32, m_f32, (c, _) = measure(gplt.ccdf, data, dtype=np.float32)
+    assert np.allclose(a, b) and np.allclose(a, c) and np.all(np.equal(x, y))
+    print(f"{name}:")
+    print(f"  original      : {t_ref:8.4f}s {m_ref / 1e6:8.1f}MB")
+    print(f"  ccdf          : {t_new:8.4f}s {m_new / 1e6:8.1f}MB")
+    print(f"  ccdf (float32): {t_f32:8.4f}s {m_f32 / 1e6:8.1f}MB")
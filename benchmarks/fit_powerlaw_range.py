@@ -0,0 +1,49 @@
+"""
+:py:func:`GooseMPL.fit_powerlaw_range` versus calling :py:func:`GooseMPL.fit_powerlaw`
+for all windows.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import GooseMPL as gplt
+
+
+def fit_powerlaw_range_reference(x, y, min_points, tol):
+    """
+    Widest window with a root-mean-square residual below ``tol``,
+    from one call to :py:func:`GooseMPL.fit_powerlaw` per window.
+    """
+    best = (-np.inf, 0, 0)
+    for i in range(x.size):
+        for j in range(i + min_points, x.size + 1):
+            fit = gplt.fit_powerlaw(x[i:j], y[i:j])
+            res = np.log(y[i:j]) - np.log(fit["prefactor"] * x[i:j] ** fit["exponent"])
+            rms = np.sqrt(np.sum(res**2) / (j - i - 2))
+            span = np.log(x[j - 1] / x[i])
+            if rms <= tol and span > best[0]:
+                best = (span, i, j)
+    return x[best[1]], x[best[2] - 1]
+
+
+def timeit(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    ret = func(*args, **kwargs)
+    return time.perf_counter() - t0, ret
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--size", type=int, default=200, help="Number of data-points")
+parser.add_argument("--min-points", type=int, default=10, help="Minimal window size")
+args = parser.parse_args()
+
+rng = np.random.default_rng(0)
+x = np.sort(np.exp(rng.uniform(-5, 9, size=args.size)))
+y = x**2 * np.exp(-x / 300) * np.exp(rng.normal(scale=0.02, size=x.size))
+
+t_new, fit = timeit(gplt.fit_powerlaw_range, x, y, min_points=args.min_points)
+t_ref, (xmin, xmax) = timeit(fit_powerlaw_range_reference, x, y, args.min_points, fit["tol"])
+assert np.isclose(fit["xmin"], xmin) and np.isclose(fit["xmax"], xmax)
+print(f"range [{xmin:.3g}, {xmax:.3g}], exponent {fit['exponent']:.3f}")
+print(f"fit_powerlaw_range: {t_new:.4f}s (fit_powerlaw per window: {t_ref:.4f}s)")
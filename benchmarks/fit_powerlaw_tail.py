@@ -0,0 +1,63 @@
+"""
+:py:func:`GooseMPL.fit_powerlaw_tail` versus a direct scan of all candidates of ``xmin``
+(one maximum likelihood fit and Kolmogorov-Smirnov distance per candidate).
+"""
+import argparse
+import time
+
+import numpy as np
+
+import GooseMPL as gplt
+
+
+def fit_powerlaw_tail_reference(data, min_tail=10):
+    """
+    Continuous maximum likelihood fit, scanning all unique values as ``xmin``.
+    """
+    data = np.sort(data)
+    best = (np.inf, None, None)
+    for xmin in np.unique(data):
+        tail = data[data >= xmin]
+        if tail.size < min_tail:
+            break
+        alpha = 1 + tail.size / np.sum(np.log(tail / xmin))
+        cdf = 1 - (tail / xmin) ** (1 - alpha)
+        emp = np.arange(tail.size) / tail.size
+        ks = max(np.max(np.abs(emp - cdf)), np.max(np.abs(emp + 1 / tail.size - cdf)))
+        if ks < best[0]:
+            best = (ks, alpha, xmin)
+    return best
+
+
+def sample(rng, size):
+    """
+    Powerlaw tail (``alpha = 2.5``) above 5, uniform below.
+    """
+    tail = 5 * (1 - rng.random(size // 2)) ** (-1 / 1.5)
+    return np.concatenate((tail, rng.uniform(0.1, 5, size=size - size // 2)))
+
+
+def timeit(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    ret = func(*args, **kwargs)
+    return time.perf_counter() - t0, ret
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--size", type=int, default=10_000_000, help="Number of samples")
+parser.add_argument("--reference", type=int, default=20_000, help="Idem, for the direct scan")
+args = parser.parse_args()
+
+rng = np.random.default_rng(0)
+
+data = sample(rng, args.reference)
+t_ref, (ks, alpha, xmin) = timeit(fit_powerlaw_tail_reference, data)
+t_new, fit = timeit(gplt.fit_powerlaw_tail, data)
+assert np.abs(fit["alpha"] - alpha) < fit["alpha_error"]
+print(f"{data.size:10d} samples: {t_new:8.4f}s (direct scan: {t_ref:8.4f}s)")
+print(f"  alpha = {fit['alpha']:.4f}, xmin = {fit['xmin']:.4f} (direct: {alpha:.4f}, {xmin:.4f})")
+
+data = sample(rng, args.size)
+t_new, fit = timeit(gplt.fit_powerlaw_tail, data)
+print(f"{data.size:10d} samples: {t_new:8.4f}s")
+print(f"  alpha = {fit['alpha']:.4f}, xmin = {fit['xmin']:.4f}")
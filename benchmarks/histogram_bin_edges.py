@@ -0,0 +1,74 @@
+"""
+Merging of bin-edges: current implementation versus the original (iterative) implementation.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import GooseMPL as gplt
+
+
+def mincount_reference(data, min_count, bins):
+    """
+    Original implementation of :py:func:`GooseMPL.histogram_bin_edges_mincount`.
+    """
+    while True:
+        P, _ = np.histogram(data, bins=bins, density=False)
+        idx = np.where(P < min_count)[0]
+        if len(idx) == 0:
+            return bins
+        idx = idx[0]
+        if idx + 1 == len(P):
+            bins = np.hstack((bins[:idx], bins[-1]))
+        else:
+            j = idx + 1
+            k = idx + 2
+            bins = np.hstack((bins[:j], bins[k:]))
+
+
+def minwidth_reference(min_width, bins):
+    """
+    Original implementation of :py:func:`GooseMPL.histogram_bin_edges_minwidth`.
+    """
+    while True:
+        idx = np.where(np.diff(bins) < min_width)[0]
+        if len(idx) == 0:
+            return bins
+        idx = idx[0]
+        if idx + 1 == len(bins) - 1:
+            bins = np.hstack((bins[:idx], bins[-1]))
+        else:
+            j = idx + 1
+            k = idx + 2
+            bins = np.hstack((bins[:j], bins[k:]))
+
+
+def timeit(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    ret = func(*args, **kwargs)
+    return time.perf_counter() - t0, ret
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--size", type=int, default=1_000_000, help="Number of samples")
+parser.add_argument("--bins", type=int, default=2000, help="Number of bins")
+parser.add_argument("--edges", type=int, default=20000, help="Number of edges (minwidth)")
+args = parser.parse_args()
+
+rng = np.random.default_rng(0)
+data = rng.pareto(1.5, size=args.size)
+bins = np.linspace(0, np.max(data), args.bins + 1)
+
+t_new, a = timeit(gplt.histogram_bin_edges_mincount, data, min_count=10, bins=bins)
+t_ref, b = timeit(mincount_reference, data, min_count=10, bins=bins)
+assert np.all(np.equal(a, b))
+print(f"histogram_bin_edges_mincount: {t_new:.4f}s (original: {t_ref:.4f}s, {len(a)} edges)")
+
+bins = np.sort(rng.pareto(1.5, size=args.edges))
+min_width = np.mean(np.diff(bins))
+
+t_new, a = timeit(gplt.histogram_bin_edges_minwidth, min_width=min_width, bins=bins)
+t_ref, b = timeit(minwidth_reference, min_width=min_width, bins=bins)
+assert np.all(np.equal(a, b))
+print(f"histogram_bin_edges_minwidth: {t_new:.4f}s (original: {t_ref:.4f}s, {len(a)} edges)")
@@ -0,0 +1,42 @@
+"""
+Cold import time of GooseMPL, compared to that of numpy (its only import-time dependency).
+Each import is timed in a fresh interpreter, the fastest of several runs is reported.
+"""
+import argparse
+import subprocess
+import sys
+
+code = """
+import time
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0)
+"""
+
+
+def cold_import(module: str, repeat: int) -> float:
+    """
+    Fastest cold import time [s] of ``module`` in ``repeat`` fresh interpreters.
+    """
+    ret = []
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, "-c", code.format(module=module)])
+        ret.append(float(out))
+    return min(ret)
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--repeat", type=int, default=10, help="Number of fresh interpreters")
+parser.add_argument("--max-overhead", type=float, help="Fail if GooseMPL - numpy exceeds this [s]")
+args = parser.parse_args()
+
+t_numpy = cold_import("numpy", args.repeat)
+t_gplt = cold_import("GooseMPL", args.repeat)
+overhead = t_gplt - t_numpy
+
+print(f"numpy    : {1e3 * t_numpy:8.2f} ms")
+print(f"GooseMPL : {1e3 * t_gplt:8.2f} ms")
+print(f"overhead : {1e3 * overhead:8.2f} ms")
+
+if args.max_overhead is not None and overhead > args.max_overhead:
+    sys.exit(f"Import overhead {overhead:.3f}s exceeds {args.max_overhead:.3f}s")
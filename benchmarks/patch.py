@@ -0,0 +1,77 @@
+"""
+Plotting a mesh with :py:func:`GooseMPL.patch` versus the original implementation
+(one ``matplotlib.patches.Polygon`` per element).
+"""
+import argparse
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from matplotlib.collections import PatchCollection  # noqa: E402
+from matplotlib.patches import Polygon  # noqa: E402
+
+import GooseMPL as gplt  # noqa: E402
+
+
+def patch_reference(coor, conn, cindex, axis):
+    """
+    Original implementation of :py:func:`GooseMPL.patch` (without autoscale).
+    """
+    poly = []
+    for iconn in conn:
+        poly.append(Polygon(coor[iconn, :]))
+    p = PatchCollection(poly, edgecolor="k")
+    p.set_array(cindex)
+    axis.add_collection(p)
+    return p
+
+
+def mesh(n):
+    """
+    Regular mesh of ``n x n`` quadrilateral elements.
+    """
+    x, y = np.meshgrid(np.arange(n + 1, dtype=float), np.arange(n + 1, dtype=float))
+    coor = np.column_stack((x.ravel(), y.ravel()))
+    nodes = np.arange((n + 1) ** 2).reshape(n + 1, n + 1)
+    conn = np.column_stack(
+        (
+            nodes[:-1, :-1].ravel(),
+            nodes[:-1, 1:].ravel(),
+            nodes[1:, 1:].ravel(),
+            nodes[1:, :-1].ravel(),
+        )
+    )
+    return coor, conn
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--max-size", type=int, default=10**6, help="Maximal number of elements")
+parser.add_argument("--max-reference", type=int, default=10**5, help="Idem, for the original")
+args = parser.parse_args()
+
+for n in [32, 100, 316, 1000, 3162]:
+    if n**2 > args.max_size:
+        break
+
+    coor, conn = mesh(n)
+    cindex = np.random.random(conn.shape[0])
+
+    fig, ax = plt.subplots()
+    t0 = time.perf_counter()
+    gplt.patch(coor=coor, conn=conn, cindex=cindex, axis=ax, autoscale=False)
+    t_new = time.perf_counter() - t0
+    plt.close(fig)
+
+    t_ref = np.nan
+    if n**2 <= args.max_reference:
+        fig, ax = plt.subplots()
+        t0 = time.perf_counter()
+        patch_reference(coor, conn, cindex, ax)
+        t_ref = time.perf_counter() - t0
+        plt.close(fig)
+
+    print(f"{conn.shape[0]:8d} elements: {t_new:8.4f}s (original: {t_ref:8.4f}s)")
@@ -1,3 +1,7 @@
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 
 import matplotlib.pyplot as plt
@@ -6,6 +10,18 @@ import numpy as np
 import GooseMPL as gplt
 
 
+class Test_import(unittest.TestCase):
+    """
+    Import of the module.
+    """
+
+    def test_lazy(self):
+        heavy = ["matplotlib", "scipy", "yaml", "deprecation"]
+        code = f"import sys, GooseMPL; print([m for m in {heavy} if m in sys.modules])"
+        out = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(out.decode().strip(), "[]")
+
+
 class Test_ticks(unittest.TestCase):
     """
     Functions generating ticks.
@@ -144,6 +160,57 @@ class Test_fit_powerlaw(unittest.TestCase):
         self.assertTrue(np.isclose(fit["prefactor"], 1.2))
         self.assertTrue(np.isclose(fit["exponent"], 3.4))
 
+    def test_bootstrap(self):
+        x = np.logspace(-2, 2, 200)
+        y = 1.2 * x**3.4 * np.exp(np.random.normal(scale=0.1, size=x.size))
+        fit = gplt.fit_powerlaw(x, y, bootstrap=2500, bootstrap_seed=0)
+        parallel = gplt.fit_powerlaw(x, y, bootstrap=2500, bootstrap_seed=0, bootstrap_workers=2)
+
+        for key in ["prefactor", "exponent"]:
+            lower, upper = fit[f"{key}_interval"]
+            self.assertLess(lower, fit[key])
+            self.assertGreater(upper, fit[key])
+            self.assertTrue(np.allclose(fit[f"{key}_interval"], parallel[f"{key}_interval"]))
+
+        # bootstrap interval ~ +/- 2 standard deviations
+        width = np.diff(fit["exponent_interval"])[0]
+        self.assertTrue(np.isclose(width, 2 * 1.96 * fit["exponent_error"], rtol=0.2))
+
+        fit = gplt.fit_powerlaw(x, y, prefactor=1.2, bootstrap=100)
+        self.assertTrue(np.allclose(fit["prefactor_interval"], 1.2))
+
+    def test_fixed(self):
+        x = np.logspace(0, 2, 20)
+        y = 3 * x**1.5 * np.exp(np.random.normal(scale=0.1, size=x.size))
+        self.assertEqual(gplt.fit_powerlaw(x, y, prefactor=3.0)["prefactor"], 3.0)
+        self.assertEqual(gplt.fit_powerlaw(x, y, exponent=1.5)["exponent"], 1.5)
+        self.assertEqual(gplt.fit_exp(x, y, prefactor=3.0)["prefactor"], 3.0)
+
+    def test_bootstrap_small(self):
+        x = np.array([1, 2, 3, 4, 5])
+        y = 2 * x**1.5 * np.exp(np.random.normal(scale=0.1, size=x.size))
+        dropped = 0
+        for seed in range(10):
+            fit = gplt.fit_powerlaw(x, y, bootstrap=1000, bootstrap_seed=seed)
+            self.assertTrue(np.all(np.isfinite(fit["exponent_interval"])))
+            self.assertTrue(np.all(np.isfinite(fit["prefactor_interval"])))
+            dropped += fit["bootstrap_dropped"]
+
+        # resamples with all x identical occur with probability 5 / 5**5
+        self.assertGreater(dropped, 0)
+
+    def test_bootstrap_degenerate(self):
+        # resamples of only log(5) have a tiny but non-zero variance due to round-off
+        x = np.array([5, 5, 5, 5, 5, 5, 17], dtype=float)
+        y = 2 * x**1.5
+        fit = gplt.fit_powerlaw(x, y, bootstrap=1000, bootstrap_seed=0)
+        self.assertGreater(fit["bootstrap_dropped"], 0)
+        self.assertTrue(np.allclose(fit["exponent_interval"], 1.5))
+        self.assertTrue(np.allclose(fit["prefactor_interval"], 2))
+
+        fit = gplt.fit_powerlaw(x, y, exponent=1.5, bootstrap=1000, bootstrap_seed=0)
+        self.assertEqual(fit["bootstrap_dropped"], 0)
+
 
 class Test_fit_exp(unittest.TestCase):
     """
@@ -239,6 +306,258 @@ class Test_fit_linear(unittest.TestCase):
         self.assertTrue(np.isclose(fit["offset"], 1.2))
         self.assertTrue(np.isclose(fit["slope"], 3.4))
 
+    def test_error(self):
+        x = np.linspace(0, 1, 100)
+        y = 1.2 + 3.4 * x + np.random.normal(scale=0.1, size=x.size)
+        yerr = np.random.uniform(0.05, 0.15, size=x.size)
+
+        for kwargs, cov in [
+            ({}, True),
+            ({"yerr": yerr, "absolute_sigma": False}, True),
+            ({"yerr": yerr, "absolute_sigma": True}, "unscaled"),
+        ]:
+            fit = gplt.fit_linear(x, y, **kwargs)
+            w = 1 / kwargs["yerr"] if "yerr" in kwargs else None
+            p, pcov = np.polyfit(x, y, 1, w=w, cov=cov)
+            self.assertTrue(np.isclose(fit["offset"], p[1]))
+            self.assertTrue(np.isclose(fit["slope"], p[0]))
+            self.assertTrue(np.isclose(fit["offset_error"], np.sqrt(pcov[1, 1])))
+            self.assertTrue(np.isclose(fit["slope_error"], np.sqrt(pcov[0, 0])))
+            self.assertTrue(np.allclose(fit["pcov"], pcov[::-1, ::-1]))
+
+
+class Test_fit_batch(unittest.TestCase):
+    """
+    Fit many curves at once.
+    """
+
+    def test_compare(self):
+        x = np.linspace(-0.5, 2, 50)
+        y = np.exp(np.random.normal(size=(4, 50)))
+        y[0, 3] = np.nan
+        y[1, 5] = -1
+        yerr = np.random.uniform(0.01, 0.1, size=y.shape) * np.abs(y)
+        mask = np.ones(y.shape, dtype=bool)
+        mask[2, 10:20] = False
+
+        for func, batch, keys in [
+            (gplt.fit_powerlaw, gplt.fit_powerlaw_batch, ["prefactor", "exponent"]),
+            (gplt.fit_exp, gplt.fit_exp_batch, ["prefactor", "exponent"]),
+            (gplt.fit_log, gplt.fit_log_batch, ["offset", "slope"]),
+            (gplt.fit_linear, gplt.fit_linear_batch, ["offset", "slope"]),
+        ]:
+            for kwargs in [{}, {keys[0]: 1.2}, {keys[1]: 0.5}]:
+                for err in [None, yerr]:
+                    fit = batch(x, y, err, mask, **kwargs)
+                    for i in range(y.shape[0]):
+                        keep = mask[i] & ~np.isnan(y[i])
+                        if keys[0] == "prefactor":
+                            keep &= y[i] > 0
+                        e = None if err is None else err[i][keep]
+                        ref = func(x[keep], y[i][keep], e, **kwargs)
+                        for key in keys + [key + "_error" for key in keys]:
+                            self.assertTrue(np.isclose(fit[key][i], ref[key]))
+
+        fit = gplt.fit_powerlaw_batch(x, y, prefactor=3.0)
+        self.assertTrue(np.all(fit["prefactor"] == 3.0))
+        fit = gplt.fit_exp_batch(x, y, prefactor=[3.0, 2.0, 1.0, 0.5])
+        self.assertTrue(np.all(fit["prefactor"] == [3.0, 2.0, 1.0, 0.5]))
+
+
+class Test_FitAccumulator(unittest.TestCase):
+    """
+    Fit of data added chunk-by-chunk.
+    """
+
+    def test_compare(self):
+        x = np.linspace(-0.5, 2, 200)
+        y = np.exp(np.random.normal(size=x.size))
+        y[3] = np.nan
+        y[7] = -1
+        yerr = np.random.uniform(0.01, 0.1, size=y.shape) * np.abs(y)
+
+        for mode, func, keys in [
+            ("powerlaw", gplt.fit_powerlaw, ["prefactor", "exponent"]),
+            ("exp", gplt.fit_exp, ["prefactor", "exponent"]),
+            ("log", gplt.fit_log, ["offset", "slope"]),
+            ("linear", gplt.fit_linear, ["offset", "slope"]),
+        ]:
+            keep = ~np.isnan(y)
+            if mode in ["powerlaw", "exp"]:
+                keep &= y > 0
+            if mode in ["powerlaw", "log"]:
+                keep &= x > 0
+
+            for kwargs in [{}, {keys[0]: 1.2}, {keys[1]: 0.5}]:
+                for err in [None, yerr]:
+                    fit = gplt.FitAccumulator(mode)
+                    other = gplt.FitAccumulator(mode)
+                    for i in np.array_split(np.arange(120), 7):
+                        fit.add(x[i], y[i], None if err is None else err[i])
+                    for i in np.array_split(np.arange(120, x.size), 3):
+                        other.add(x[i], y[i], None if err is None else err[i])
+                    fit.merge(other)
+                    self.assertEqual(fit.n, np.sum(keep))
+
+                    e = None if err is None else err[keep]
+                    ref = func(x[keep], y[keep], e, **kwargs)
+                    details = fit.fit(**kwargs)
+                    for key in keys + [key + "_error" for key in keys] + ["pcov"]:
+                        self.assertTrue(np.allclose(details[key], ref[key]))
+
+        fit = gplt.FitAccumulator("exp")
+        fit.add(x, y)
+        self.assertEqual(fit.fit(prefactor=3.0)["prefactor"], 3.0)
+        self.assertEqual(fit.fit(exponent=1.5)["exponent"], 1.5)
+        self.assertEqual(fit.fit(exponent=1.5)["exponent_error"], 0.0)
+        self.assertEqual(np.ndim(fit.fit(exponent=1.5)["exponent_error"]), 0)
+
+    def test_empty(self):
+        empty = gplt.FitAccumulator("powerlaw")
+        merged = gplt.FitAccumulator("powerlaw")
+        merged.merge(gplt.FitAccumulator("powerlaw"))
+        merged.add([-1, 1], [1, -1])
+
+        for fit in [empty, merged]:
+            self.assertEqual(fit.n, 0)
+            details = fit.fit()
+            self.assertTrue(np.isnan(details["prefactor"]))
+            self.assertTrue(np.isnan(details["exponent"]))
+            self.assertEqual(fit.fit(exponent=2.0)["exponent"], 2.0)
+
+
+class Test_fit_powerlaw_range(unittest.TestCase):
+    """
+    Search of the powerlaw range.
+    """
+
+    def test_brute_force(self):
+        x = np.sort(np.exp(np.random.uniform(0, 7, size=40)))
+        y = x**2 * np.exp(-x / 100) * np.exp(np.random.normal(scale=0.01, size=x.size))
+        tol = 0.02
+        data = gplt.fit_powerlaw_range(x, y, min_points=5, tol=tol)
+
+        best = (-np.inf, 0, 0)
+        for i in range(x.size):
+            for j in range(i + 5, x.size + 1):
+                p = np.polyfit(np.log(x[i:j]), np.log(y[i:j]), 1)
+                res = np.log(y[i:j]) - np.polyval(p, np.log(x[i:j]))
+                rms = np.sqrt(np.sum(res**2) / (j - i - 2))
+                span = np.log(x[j - 1] / x[i])
+                if rms <= tol and span > best[0]:
+                    best = (span, i, j)
+
+        _, i, j = best
+        ref = gplt.fit_powerlaw(x[i:j], y[i:j])
+        self.assertEqual(data["xmin"], x[i])
+        self.assertEqual(data["xmax"], x[j - 1])
+        self.assertTrue(np.isclose(data["exponent"], ref["exponent"]))
+
+    def test_default(self):
+        x = np.logspace(-2, 4, 200)
+        y = x**2 * np.exp(-x / 300) * np.exp(np.random.normal(scale=0.02, size=x.size))
+        y[3] = -1
+        for kwargs in [{}, {"yerr": 0.02 * y}, {"stride": 4}]:
+            data = gplt.fit_powerlaw_range(x, y, **kwargs)
+            self.assertTrue(data["xmin"] < 0.1)
+            self.assertTrue(5 < data["xmax"] < 300)
+            self.assertTrue(np.isclose(data["exponent"], 2, atol=0.05))
+
+    def test_no_window(self):
+        x = np.logspace(0, 3, 50)
+        y = x**2 * np.exp(np.random.normal(scale=0.01, size=x.size))
+        with self.assertRaises(OSError):
+            gplt.fit_powerlaw_range(x, y, tol=1e-9)
+
+
+class Test_fit_powerlaw_tail(unittest.TestCase):
+    """
+    Maximum likelihood fit of a powerlaw tail.
+    """
+
+    def test_continuous(self):
+        data = np.concatenate(
+            (
+                2 * (1 - np.random.random(500)) ** (-1 / 1.5),
+                np.random.uniform(0.1, 2, size=500),
+            )
+        )
+        fit = gplt.fit_powerlaw_tail(data, candidates=data.size, ks_points=data.size)
+
+        x = np.sort(data)
+        best = (np.inf, 0, 0)
+        for k in range(x.size - 10 + 1):
+            tail = x[k:]
+            alpha = 1 + tail.size / np.sum(np.log(tail / tail[0]))
+            cdf = 1 - (tail / tail[0]) ** (1 - alpha)
+            emp = np.arange(tail.size) / tail.size
+            ks = max(np.max(np.abs(emp - cdf)), np.max(np.abs(emp + 1 / tail.size - cdf)))
+            if ks < best[0]:
+                best = (ks, alpha, tail[0])
+
+        self.assertTrue(np.isclose(fit["ks"], best[0]))
+        self.assertTrue(np.isclose(fit["alpha"], best[1]))
+        self.assertTrue(np.isclose(fit["xmin"], best[2]))
+
+    def test_discrete(self):
+        data = np.random.zipf(2.2, size=10000)
+        fit = gplt.fit_powerlaw_tail(data, xmin=1, discrete=True)
+        self.assertEqual(fit["n_tail"], data.size)
+        self.assertTrue(np.abs(fit["alpha"] - 2.2) < 5 * fit["alpha_error"])
+
+        # maximum of the likelihood
+        def f(a):
+            return -data.size * np.log(gplt._hurwitz_zeta(a, 1)) - a * np.sum(np.log(data))
+
+        self.assertTrue(f(fit["alpha"]) > f(fit["alpha"] - 1e-3))
+        self.assertTrue(f(fit["alpha"]) > f(fit["alpha"] + 1e-3))
+
+        # Riemann zeta function
+        self.assertTrue(np.isclose(gplt._hurwitz_zeta(2, 1), np.pi**2 / 6))
+        self.assertTrue(np.isclose(gplt._hurwitz_zeta(4, 1), np.pi**4 / 90))
+
+    def test_bootstrap(self):
+        data = np.random.zipf(2.5, size=1000)
+        a = gplt.fit_powerlaw_tail(data, discrete=True, bootstrap=10, bootstrap_seed=0)
+        b = gplt.fit_powerlaw_tail(
+            data, discrete=True, bootstrap=10, bootstrap_seed=0, bootstrap_workers=2
+        )
+        self.assertTrue(0 <= a["p_value"] <= 1)
+        self.assertEqual(a["p_value"], b["p_value"])
+
+
+class Test_local_exponent(unittest.TestCase):
+    """
+    Sliding-window fit of a powerlaw.
+    """
+
+    def test_compare(self):
+        x = np.logspace(0, 3, 100)
+        y = x**1.5 * np.exp(np.random.normal(scale=0.1, size=x.size))
+        y[5] = -1
+        y[40] = np.nan
+        yerr = 0.1 * y
+
+        for err in [None, yerr]:
+            for absolute_sigma in [True, False]:
+                data = gplt.local_exponent(x, y, 20, err, absolute_sigma)
+                self.assertEqual(data["exponent"].size, x.size - 20 + 1)
+                for i in [0, 3, 30, 80]:
+                    keep = np.logical_and(y[i : i + 20] > 0, ~np.isnan(y[i : i + 20]))  # noqa: E203
+                    e = None if err is None else err[i : i + 20]  # noqa: E203
+                    ref = gplt.fit_powerlaw(
+                        x[i : i + 20], y[i : i + 20], e, absolute_sigma=absolute_sigma  # noqa: E203
+                    )
+                    self.assertEqual(data["n"][i], np.sum(keep))
+                    self.assertTrue(np.isclose(data["exponent"][i], ref["exponent"]))
+                    self.assertTrue(np.isclose(data["exponent_error"][i], ref["exponent_error"]))
+
+    def test_large(self):
+        x = np.logspace(0, 5, 100000)
+        data = gplt.local_exponent(x, x**2, 10)
+        self.assertTrue(np.allclose(data["exponent"], 2))
+        self.assertTrue(np.allclose(data["x"], np.sqrt(x[4:-5] * x[5:-4])))
+
 
 class Test_cdf(unittest.TestCase):
     """
@@ -268,7 +587,8 @@ class Test_cdf(unittest.TestCase):
         p, x = gplt.ccdf(data, greater_equal=False)
 
         self.assertTrue(np.allclose(x, xr))
-        self.assertTrue(np.allclose(p, np.cumsum([0] + pr[::-1].tolist())[1::-1]))
+        self.assertTrue(np.allclose(p, np.cumsum([0] + pr[::-1].tolist())[-2::-1]))
+        self.assertTrue(np.allclose(p, [np.mean(data > i) for i in xr]))
 
         p, x = gplt.cdf(data)
         pc, xc = gplt.ccdf(data)
@@ -293,6 +613,147 @@ class Test_cdf(unittest.TestCase):
 
         self.assertTrue(np.allclose(1 - xp, pp, rtol=1e-1, atol=1e-1))
 
+    def test_dtype(self):
+        data = np.random.randint(0, 100, size=1000).astype(float)
+        data[[3, 10]] = np.nan
+        xr, count = np.unique(data, return_counts=True)
+
+        for func, opt, pr in [
+            (gplt.cdf, "less_equal", np.cumsum(count) / data.size),
+            (gplt.ccdf, "greater_equal", np.cumsum(count[::-1])[::-1] / data.size),
+        ]:
+            p, x = func(data, **{opt: True})
+            self.assertTrue(np.allclose(x, xr, equal_nan=True))
+            self.assertTrue(np.allclose(p, pr))
+            self.assertEqual(p.dtype, np.float64)
+
+            p, x = func(data, dtype=np.float32, **{opt: True})
+            self.assertTrue(np.allclose(p, pr))
+            self.assertEqual(p.dtype, np.float32)
+
+    def test_decimate(self):
+        P, X = gplt.ccdf(np.random.pareto(1.5, size=100000))
+
+        p, x = gplt.cdf_decimate(P, X, dp=1e-3, tail=10)
+        self.assertLess(p.size, 3000)
+        self.assertTrue(np.all(np.abs(np.interp(X, x, p) - P) < 1e-3))
+        self.assertTrue(np.all(np.equal(p[-10:], P[-10:])))
+        self.assertTrue(np.all(np.equal(x[-10:], X[-10:])))
+
+        p, x = gplt.cdf_decimate(P, X, dp=1e-2, dx=1e-2, logp=True, logx=True, tail=10)
+        self.assertLess(p.size, 3000)
+        self.assertTrue(np.all(np.abs(np.log10(np.interp(X, x, p) / P)) < 1e-2))
+        self.assertTrue(np.all(np.equal(p[-10:], P[-10:])))
+        self.assertTrue(np.all(np.equal(x[-10:], X[-10:])))
+
+        p, x = gplt.cdf_decimate(P, X, dp=1e-2, tail=0)
+        self.assertEqual(p[0], P[0])
+        self.assertEqual(p[-1], P[-1])
+
+    def test_workers(self):
+        data = np.random.randint(0, 1000, size=10000) / 10
+
+        for func, opt in [(gplt.cdf, "less_equal"), (gplt.ccdf, "greater_equal")]:
+            for value in [True, False]:
+                p, x = func(data, **{opt: value})
+                pw, xw = func(data, workers=3, **{opt: value})
+                self.assertTrue(np.all(np.equal(p, pw)))
+                self.assertTrue(np.all(np.equal(x, xw)))
+
+
+class Test_histogram(unittest.TestCase):
+    """
+    Histogram.
+    """
+
+    def test_workers(self):
+        data = np.random.normal(size=10001)
+
+        for bins in [10, np.linspace(-2, 2, 21), "auto"]:
+            for density in [False, True]:
+                p, x = gplt.histogram(data, bins=bins, density=density)
+                pw, xw = gplt.histogram(data, bins=bins, density=density, workers=3)
+                self.assertTrue(np.all(np.equal(p, pw)))
+                self.assertTrue(np.all(np.equal(x, xw)))
+
+        p, x = gplt.histogram_cumulative(data, bins=10, range=(-1, 1), normalize=True)
+        pw, xw = gplt.histogram_cumulative(data, bins=10, range=(-1, 1), normalize=True, workers=3)
+        self.assertTrue(np.all(np.equal(p, pw)))
+        self.assertTrue(np.all(np.equal(x, xw)))
+
+
+class Test_patch(unittest.TestCase):
+    """
+    Plot a mesh.
+    """
+
+    def test_simple(self):
+        coor = np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [0.0, 1.0], [1.0, 1.0], [2.0, 1.0]])
+        conn = np.array([[0, 1, 4, 3], [1, 2, 5, 4]])
+        value = np.array([-1.0, +1.0])
+
+        fig, ax = plt.subplots()
+        p = gplt.patch(coor=coor, conn=conn, cindex=value, clim=[-2, 2], cmap="RdBu_r", axis=ax)
+
+        self.assertEqual(len(p.get_paths()), 2)
+        for path, iconn in zip(p.get_paths(), conn):
+            self.assertTrue(np.allclose(path.vertices[:4], coor[iconn]))
+        self.assertTrue(np.allclose(p.get_array(), value))
+        self.assertEqual(p.get_clim(), (-2, 2))
+        self.assertEqual(p.get_cmap().name, "RdBu_r")
+        self.assertTrue(np.allclose(ax.get_xlim(), [-0.2, 2.2]))
+        self.assertTrue(np.allclose(ax.get_ylim(), [-0.1, 1.1]))
+        self.assertIn(p, ax.collections)
+
+        plt.close(fig)
+
+    def test_mixed(self):
+        coor = np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [0.0, 1.0], [1.0, 1.0], [2.0, 1.0]])
+        conn = [[0, 1, 4, 3], [1, 2, 4], [2, 5, 4]]
+        value = np.array([-1.0, 0.0, +1.0])
+
+        fig, ax = plt.subplots()
+        p = gplt.patch(coor=coor, conn=conn, cindex=value, axis=ax)
+
+        self.assertEqual(len(p.get_paths()), 3)
+        for path, iconn in zip(p.get_paths(), conn):
+            self.assertTrue(np.allclose(path.vertices[: len(iconn)], coor[iconn]))
+        self.assertTrue(np.allclose(p.get_array(), value))
+
+        with self.assertRaises(OSError):
+            gplt.patch(p, coor=coor, conn=conn, axis=ax)
+
+        plt.close(fig)
+
+    def test_handle(self):
+        coor = np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [0.0, 1.0], [1.0, 1.0], [2.0, 1.0]])
+        conn = np.array([[0, 1, 4, 3], [1, 2, 5, 4]])
+        value = np.array([-1.0, +1.0])
+
+        fig, ax = plt.subplots()
+        mesh = gplt.PatchHandle(coor=coor, conn=conn, cindex=value, clim=[-2, 2], axis=ax)
+        paths = mesh.collection.get_paths()
+        fig.canvas.draw()
+
+        coor = coor + 0.1 * np.random.random(coor.shape)
+        ret = mesh.update(coor=coor, cindex=-value)
+
+        self.assertEqual(ret, [mesh.collection])
+        self.assertEqual(len(ax.collections), 1)
+        for i, (path, iconn) in enumerate(zip(mesh.collection.get_paths(), conn)):
+            self.assertIs(path, paths[i])
+            self.assertTrue(np.allclose(path.vertices[:4], coor[iconn]))
+            self.assertEqual(path.codes[-1], path.CLOSEPOLY)
+        self.assertTrue(np.allclose(mesh.collection.get_array(), -value))
+
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, "movie.gif")
+            frames = [{"coor": coor + i, "cindex": value * i} for i in range(3)]
+            mesh.save(filename, frames, writer="pillow", fps=2)
+            self.assertTrue(os.path.isfile(filename))
+
+        plt.close(fig)
+
 
 class Test_bin(unittest.TestCase):
     """
@@ -318,6 +779,146 @@ class Test_bin(unittest.TestCase):
         for key in data:
             self.assertTrue(np.allclose(data[key], median_data[key]))
 
+    def test_random(self):
+        x = np.random.random(1000)
+        y = np.random.random(1000)
+        bin_edges = np.linspace(0.1, 0.9, 9)
+        data = gplt.bin(x, y, bin_edges, return_n=True)
+        median_data = gplt.bin(x, y, bin_edges, use_median=True)
+
+        for i in range(bin_edges.size - 1):
+            sel = (x >= bin_edges[i]) & (x < bin_edges[i + 1])
+            self.assertEqual(data["n"][i], np.sum(sel))
+            self.assertTrue(np.isclose(data["x"][i], np.mean(x[sel])))
+            self.assertTrue(np.isclose(data["y"][i], np.mean(y[sel])))
+            self.assertTrue(np.isclose(data["xerr"][i], np.std(x[sel])))
+            self.assertTrue(np.isclose(data["yerr"][i], np.std(y[sel])))
+            self.assertTrue(np.isclose(median_data["x"][i], np.median(x[sel])))
+            self.assertTrue(np.isclose(median_data["y"][i], np.median(y[sel])))
+
+    def test_int(self):
+        x = np.array([0, 1, 1, 2, 3, 4])
+        y = np.array([1, 2, 4, 3, 3, 5])
+        data = gplt.bin(x, y, 2, return_n=True)
+
+        self.assertTrue(np.all(np.equal(data["n"], [3, 3])))
+        self.assertTrue(np.allclose(data["y"], [7 / 3, 11 / 3]))
+
+        data = gplt.bin(x, y, [1, 2, 3, 4], return_n=True)
+
+        self.assertTrue(np.all(np.equal(data["n"], [2, 1, 2])))
+        self.assertTrue(np.allclose(data["y"], [3, 3, 4]))
+
+    def test_columns(self):
+        x = np.random.random(1000)
+        y = np.random.random((1000, 3))
+        bin_edges = np.linspace(0, 1, 11)
+
+        data = gplt.bin(x, y, bin_edges, use_median=True)
+        named = gplt.bin(x, {"a": y[:, 0], "c": y[:, 2]}, bin_edges, use_median=True)
+
+        for i in range(y.shape[1]):
+            ref = gplt.bin(x, y[:, i], bin_edges, use_median=True)
+            for key in ref:
+                value = data[key][..., i] if key[0] == "y" else data[key]
+                self.assertTrue(np.allclose(value, ref[key]))
+            if i != 1:
+                name = "a" if i == 0 else "c"
+                self.assertTrue(np.allclose(named["y"][name], ref["y"]))
+                self.assertTrue(np.allclose(named["yerr"][name], ref["yerr"]))
+
+    def test_nd(self):
+        x = np.random.random((50, 20))
+        y = np.random.random((50, 20))
+        bin_edges = np.linspace(0, 1, 11)
+        data = gplt.bin(x, y, bin_edges, return_n=True)
+        ref = gplt.bin(x.ravel(), y.ravel(), bin_edges, return_n=True)
+
+        for key in ref:
+            self.assertEqual(data[key].shape, ref[key].shape)
+            self.assertTrue(np.allclose(data[key], ref[key]))
+
+    def test_quantiles(self):
+        x = np.random.random(1000)
+        y = np.random.random(1000)
+        bin_edges = np.array([0, 0.2, 0.5, 1.0, 1.5])
+        q = [0.05, 0.25, 0.75, 0.95]
+        data = gplt.bin(x, y, bin_edges, quantiles=q)
+
+        self.assertEqual(data["yq"].shape, (4, 4))
+        self.assertTrue(np.all(np.isnan(data["yq"][:, -1])))
+
+        for i in range(bin_edges.size - 2):
+            sel = (x >= bin_edges[i]) & (x < bin_edges[i + 1])
+            self.assertTrue(np.allclose(data["yq"][:, i], np.quantile(y[sel], q)))
+
+        data = gplt.bin(x, np.column_stack((y, 2 * y)), bin_edges, quantiles=q)
+        self.assertEqual(data["yq"].shape, (4, 4, 2))
+        self.assertTrue(np.allclose(data["yq"][..., 1], 2 * data["yq"][..., 0], equal_nan=True))
+
+        fig, ax = plt.subplots()
+        handles = gplt.plot_bands(data["x"], data["yq"][..., 0], axis=ax)
+        self.assertEqual(len(handles), 2)
+        self.assertEqual(len(ax.collections), 2)
+        plt.close(fig)
+
+
+class Test_bin2d(unittest.TestCase):
+    """
+    Bin data on a two-dimensional grid.
+    """
+
+    def test_random(self):
+        x = np.random.random(2000)
+        y = 10 ** np.random.random(2000)
+        z = np.random.normal(size=2000)
+
+        data = gplt.bin2d(x, y, z, bins=(4, 3), mode=("equal", "log"), quantiles=[0.1, 0.9])
+        median = gplt.bin2d(x, y, z, bins=(data["xedges"], data["yedges"]), use_median=True)
+        xe = data["xedges"]
+        ye = data["yedges"]
+
+        self.assertEqual(data["z"].shape, (3, 4))
+        self.assertEqual(data["zq"].shape, (2, 3, 4))
+        self.assertTrue(np.allclose(ye, np.logspace(np.log10(np.min(y)), np.log10(np.max(y)), 4)))
+        self.assertEqual(np.sum(data["n"]), x.size)
+        self.assertTrue(np.all(np.equal(data["n"], np.histogram2d(y, x, bins=(ye, xe))[0])))
+
+        for j in range(3):
+            for i in range(4):
+                sel = (x >= xe[i]) & (x <= xe[i + 1]) & (y >= ye[j]) & (y <= ye[j + 1])
+                self.assertTrue(np.isclose(data["z"][j, i], np.mean(z[sel])))
+                self.assertTrue(np.isclose(data["zerr"][j, i], np.std(z[sel])))
+                self.assertTrue(np.isclose(median["z"][j, i], np.median(z[sel])))
+                self.assertTrue(np.allclose(data["zq"][:, j, i], np.quantile(z[sel], [0.1, 0.9])))
+
+
+class Test_BinAccumulator(unittest.TestCase):
+    """
+    Bin data chunk-by-chunk.
+    """
+
+    def test_merge(self):
+        x = np.random.random(10000)
+        y = 1e6 + np.random.normal(size=x.size)
+        bin_edges = np.linspace(0, 1.2, 13)
+        a = gplt.BinAccumulator(bin_edges)
+        b = gplt.BinAccumulator(12, lim=(0, 1.2))
+
+        for i, (xi, yi) in enumerate(zip(np.split(x, 10), np.split(y, 10))):
+            if i % 2 == 0:
+                a.add(xi, yi)
+            else:
+                b.add(xi, yi)
+        a.merge(b)
+
+        data = gplt.bin(x, y, bin_edges, return_n=True)
+        ret = a.bin(return_n=True)
+        self.assertEqual(list(ret), list(data))
+
+        for key in data:
+            self.assertTrue(np.allclose(ret[key], data[key], equal_nan=True))
+
 
 class Test_histogram_norm(unittest.TestCase):
     """
@@ -400,6 +1001,213 @@ class Test_histogram_rebin(unittest.TestCase):
         self.assertEqual(bin_edges_new, bin_edges_new2.tolist())
 
 
+def histogram_bin_edges_mincount_reference(data, min_count, bins):
+    """
+    Original implementation of :py:func:`GooseMPL.histogram_bin_edges_mincount`.
+    """
+    while True:
+        P, _ = np.histogram(data, bins=bins, density=False)
+        idx = np.where(P < min_count)[0]
+        if len(idx) == 0:
+            return bins
+        idx = idx[0]
+        if idx + 1 == len(P):
+            bins = np.hstack((bins[:idx], bins[-1]))
+        else:
+            j = idx + 1
+            k = idx + 2
+            bins = np.hstack((bins[:j], bins[k:]))
+
+
+def histogram_bin_edges_minwidth_reference(min_width, bins):
+    """
+    Original implementation of :py:func:`GooseMPL.histogram_bin_edges_minwidth`.
+    """
+    while True:
+        idx = np.where(np.diff(bins) < min_width)[0]
+        if len(idx) == 0:
+            return bins
+        idx = idx[0]
+        if idx + 1 == len(bins) - 1:
+            bins = np.hstack((bins[:idx], bins[-1]))
+        else:
+            j = idx + 1
+            k = idx + 2
+            bins = np.hstack((bins[:j], bins[k:]))
+
+
+class Test_histogram_bin_edges_minwidth(unittest.TestCase):
+    """
+    Merge bins that are too narrow.
+    """
+
+    def test_simple(self):
+        bins = np.array([0, 1, 1.5, 2, 4, 4.5])
+        bin_edges = gplt.histogram_bin_edges_minwidth(min_width=1, bins=bins)
+        self.assertEqual(bin_edges.tolist(), [0, 1, 2, 4.5])
+
+    def test_reference(self):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            bins = np.cumsum(rng.exponential(size=500))
+            for min_width in [0.1, 0.5, 1, 5]:
+                a = gplt.histogram_bin_edges_minwidth(min_width=min_width, bins=bins)
+                b = histogram_bin_edges_minwidth_reference(min_width=min_width, bins=bins)
+                self.assertEqual(a.tolist(), b.tolist())
+
+
+class Test_histogram_bin_edges_mincount(unittest.TestCase):
+    """
+    Merge bins with too few data-points.
+    """
+
+    def test_simple(self):
+        data = [0.5, 1.5, 1.5, 2.5, 3.5, 3.5, 3.5, 4.5]
+        bins = np.array([0, 1, 2, 3, 4, 5])
+        bin_edges = gplt.histogram_bin_edges_mincount(data, min_count=2, bins=bins)
+        self.assertEqual(bin_edges.tolist(), [0, 2, 5])
+
+    def test_reference(self):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            data = rng.pareto(1.5, size=1000)
+            bins = np.linspace(0, np.max(data), 200)
+            for min_count in [1, 2, 5, 20]:
+                a = gplt.histogram_bin_edges_mincount(data, min_count=min_count, bins=bins)
+                b = histogram_bin_edges_mincount_reference(data, min_count=min_count, bins=bins)
+                self.assertEqual(a.tolist(), b.tolist())
+
+
+class Test_histogram_rows(unittest.TestCase):
+    """
+    Histogram of each row.
+    """
+
+    def test_simple(self):
+        data = np.random.normal(size=(20, 1000))
+        data[0, :3] = [-np.inf, np.nan, np.inf]
+        data[1, :2] = [-2, 2]
+        bin_edges = np.linspace(-2, 2, 11)
+        weights = np.random.random(data.shape)
+
+        P, x = gplt.histogram_rows(data, bins=bin_edges)
+        W, _ = gplt.histogram_rows(data, bins=bin_edges, weights=weights)
+        D, _ = gplt.histogram_rows(data, bins=bin_edges, density=True)
+
+        self.assertEqual(P.shape, (20, 10))
+        self.assertTrue(np.all(np.equal(x, bin_edges)))
+
+        for i in range(data.shape[0]):
+            count, _ = np.histogram(data[i], bins=bin_edges)
+            self.assertTrue(np.all(np.equal(P[i], count)))
+            count, _ = np.histogram(data[i], bins=bin_edges, weights=weights[i])
+            self.assertTrue(np.allclose(W[i], count))
+            self.assertTrue(np.allclose(D[i], gplt.histogram_norm(P[i], bin_edges)))
+
+    def test_shape(self):
+        data = np.random.random((2, 3, 100))
+        P, x = gplt.histogram_rows(data, bins=5, return_edges=False)
+        self.assertEqual(P.shape, (2, 3, 5))
+        self.assertEqual(x.size, 5)
+        self.assertEqual(np.sum(P), data.size)
+
+
+class Test_Histogram(unittest.TestCase):
+    """
+    Histogram accumulated in chunks.
+    """
+
+    def test_chunks(self):
+        data = np.random.random(1000)
+        bin_edges = np.linspace(0, 1, 11)
+
+        hist = gplt.Histogram(bin_edges)
+        for chunk in np.split(data, 10):
+            hist.add(chunk)
+
+        count, _ = np.histogram(data, bins=bin_edges)
+        density, _ = np.histogram(data, bins=bin_edges, density=True)
+        cumulative, _ = gplt.histogram_cumulative(data, bins=bin_edges, normalize=True)
+
+        self.assertTrue(np.all(np.equal(hist.count, count)))
+        self.assertTrue(np.allclose(hist.density, density))
+        self.assertTrue(np.allclose(hist.cumulative(normalize=True), cumulative))
+        self.assertTrue(np.allclose(hist.midpoints, np.linspace(0.05, 0.95, 10)))
+
+    def test_merge(self):
+        data = np.random.random(1000)
+        a = gplt.Histogram(10, lim=(0, 1))
+        b = gplt.Histogram(10, lim=(0, 1))
+        a.add(data[:500])
+        b.add(data[500:])
+        a.merge(b)
+
+        count, bin_edges = np.histogram(data, bins=10, range=(0, 1))
+        P, x = a.histogram()
+        self.assertTrue(np.all(np.equal(P, count)))
+        self.assertTrue(np.allclose(x, bin_edges))
+
+        with self.assertRaises(OSError):
+            a.merge(gplt.Histogram(10, lim=(1e-3, 1), mode="log"))
+
+
+class Test_LogHistogram(unittest.TestCase):
+    """
+    Logarithmic histogram with a growing range.
+    """
+
+    def test_chunks(self):
+        data = 10 ** np.random.uniform(-3, 3, size=10000)
+        data[:10] = [1e-2, 1e-1, 1, 10, 100, 0, -1, np.nan, np.inf, 10 ** (1 / 7)]
+
+        hist = gplt.LogHistogram(bins_per_decade=7)
+        for chunk in np.split(data, 10):
+            hist.add(chunk)
+
+        count, _ = np.histogram(data[data > 0], bins=hist.bin_edges)
+        self.assertTrue(np.all(np.equal(hist.count, count)))
+        self.assertEqual(np.sum(hist.count), data.size - 4)
+        self.assertLessEqual(hist.bin_edges[0], np.min(data[data > 0]))
+        self.assertGreater(hist.bin_edges[-1], np.max(data[np.isfinite(data)]))
+
+        edges = np.log10(hist.bin_edges) * 7
+        self.assertTrue(np.allclose(edges, np.round(edges)))
+
+        P, x = hist.histogram(density=True)
+        self.assertTrue(np.allclose(P, gplt.histogram_norm(P, x)))
+        self.assertTrue(np.isclose(np.sum(P * np.diff(x)), 1))
+
+    def test_merge(self):
+        data = 10 ** np.random.uniform(-3, 3, size=1000)
+        a = gplt.LogHistogram()
+        b = gplt.LogHistogram()
+        c = gplt.LogHistogram()
+        a.add(data[data < 1])
+        b.add(data[data >= 1])
+        c.add(data)
+        a.merge(b)
+        a.merge(gplt.LogHistogram())
+
+        self.assertTrue(np.all(np.equal(a.count, c.count)))
+        self.assertTrue(np.allclose(a.bin_edges, c.bin_edges))
+
+        with self.assertRaises(OSError):
+            a.merge(gplt.LogHistogram(bins_per_decade=5))
+
+    def test_empty(self):
+        hist = gplt.LogHistogram()
+        self.assertEqual(hist.bin_edges.size, 0)
+        self.assertEqual(hist.density.size, 0)
+        self.assertEqual(hist.cumulative(normalize=True).size, 0)
+        P, edges = hist.histogram(density=True)
+        self.assertEqual(P.size, 0)
+        self.assertEqual(edges.size, 0)
+
+        hist = gplt.Histogram(5, lim=(0, 1))
+        self.assertTrue(np.all(np.equal(hist.density, 0)))
+        self.assertTrue(np.all(np.equal(hist.cumulative(normalize=True), 0)))
+
+
 class Test_histogram_bin_edges2midpoint(unittest.TestCase):
     """
     Midpoints of bins
@@ -449,6 +1257,125 @@ class Test_histogram_bin_edges(unittest.TestCase):
 
         self.assertTrue(np.allclose(bin_edges, np.array([0.5, 1.5, 2.5, 3.5, 4.5, 5.5, 7, 9])))
 
+    def test_uniform(self):
+        data = np.random.random(1001)
+        bin_edges = gplt.histogram_bin_edges(data, mode="uniform", remove_empty_edges=False)
+        count, _ = np.histogram(data, bins=bin_edges)
+
+        self.assertEqual(bin_edges[0], np.min(data))
+        self.assertEqual(bin_edges[-1], np.max(data))
+        self.assertTrue(np.all(np.isin(bin_edges, data)))
+        self.assertLessEqual(np.max(count) - np.min(count), 2)
+
+    def test_order_statistics(self):
+        data = np.random.randint(0, 50, size=1000)
+        for rank in [[0], [999], [0, 0, 10, 999], np.random.randint(0, 1000, size=40)]:
+            expect = np.sort(data)[rank]
+            self.assertTrue(np.all(np.equal(gplt._order_statistics(data, rank), expect)))
+
+
+class Test_QuantileSketch(unittest.TestCase):
+    """
+    Approximate quantiles.
+    """
+
+    def test_exact(self):
+        data = np.random.random(100)
+        sketch = gplt.QuantileSketch(k=128)
+        sketch.add(data)
+        self.assertEqual(sketch.rank_error, 0)
+        self.assertTrue(np.all(np.equal(sketch.rank_quantile(np.arange(100)), np.sort(data))))
+
+        a = gplt.histogram_bin_edges(data, bins=10, mode="uniform", remove_empty_edges=False)
+        self.assertTrue(np.all(np.equal(sketch.bin_edges(bins=10), a)))
+
+    def test_rank_error(self):
+        data = np.random.normal(size=200000)
+        a = gplt.QuantileSketch(k=256)
+        b = gplt.QuantileSketch(k=256)
+        for i, chunk in enumerate(np.split(data, 20)):
+            if i % 2 == 0:
+                a.add(chunk)
+            else:
+                b.add(chunk)
+        a.merge(b)
+
+        self.assertEqual(a.size, data.size)
+        self.assertGreater(a.rank_error, 0)
+        self.assertLess(sum(i.size for i in a.levels), 256 * len(a.levels))
+
+        q = np.linspace(0, 1, 101)
+        x = a.quantile(q)
+        rank = np.searchsorted(np.sort(data), x, side="right") / data.size
+        self.assertTrue(np.all(np.abs(rank - q) <= a.rank_error + 1 / data.size))
+        self.assertEqual(x[0], np.min(data))
+        self.assertEqual(x[-1], np.max(data))
+
+        bin_edges = a.bin_edges(bins=10)
+        count, _ = np.histogram(data, bins=bin_edges)
+        self.assertTrue(np.all(np.abs(count / data.size - 0.1) <= 2 * a.rank_error))
+
+    def test_to_dict(self):
+        sketch = gplt.QuantileSketch(k=64)
+        sketch.add(np.random.random(1000))
+
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, "sketch.npz")
+            np.savez(filename, **sketch.to_dict())
+            restored = gplt.QuantileSketch.from_dict(np.load(filename))
+
+        x, w = sketch.sorted()
+        xr, wr = restored.sorted()
+        self.assertTrue(np.all(np.equal(x, xr)))
+        self.assertTrue(np.all(np.equal(w, wr)))
+        self.assertEqual(sketch.offset, restored.offset)
+        self.assertEqual(sketch.size, restored.size)
+
+
+class Test_CDFSketch(unittest.TestCase):
+    """
+    Approximate (complementary) cumulative distribution.
+    """
+
+    def test_exact(self):
+        data = np.random.randint(0, 50, size=500) / 10
+        sketch = gplt.CDFSketch(tail=1000)
+        sketch.add(data)
+
+        for func, opt in [("cdf", "less_equal"), ("ccdf", "greater_equal")]:
+            for value in [True, False]:
+                p, x = getattr(gplt, func)(data, **{opt: value})
+                ps, xs = getattr(sketch, func)(**{opt: value})
+                self.assertTrue(np.allclose(p, ps))
+                self.assertTrue(np.allclose(x, xs))
+
+    def test_merge(self):
+        data = np.random.pareto(1.5, size=100000)
+        a = gplt.CDFSketch(k=256, tail=100)
+        b = gplt.CDFSketch(k=256, tail=100)
+        for i, chunk in enumerate(np.split(data, 10)):
+            if i % 2 == 0:
+                a.add(chunk)
+            else:
+                b.add(chunk)
+        a.merge(b)
+        a = gplt.CDFSketch.from_dict(a.to_dict())
+
+        P, X = a.ccdf()
+        self.assertTrue(np.all(np.diff(P) <= 0))
+        self.assertTrue(
+            np.all(np.abs(P - np.mean(data >= X.reshape(-1, 1), axis=1)) <= a.rank_error)
+        )
+
+        p, x = gplt.ccdf(data)
+        self.assertTrue(np.allclose(P[-99:], p[-99:]))
+        self.assertTrue(np.allclose(X[-99:], x[-99:]))
+
+        P, X = a.cdf(less_equal=True)
+        self.assertTrue(
+            np.all(np.abs(P - np.mean(data <= X.reshape(-1, 1), axis=1)) <= a.rank_error)
+        )
+
 
 if __name__ == "__main__":
     unittest.main()